@@ -0,0 +1,158 @@
+# Compares the threaded CANNode against AsyncCANNode
+# Starts N nodes that each listen to one ID and broadcast once a second, sends timestamped
+# probe frames to all of them and reports OS thread count, RSS and handler latency.
+# Each layout runs in its own child process so their threads and memory do not mix.
+# Run from the repository root:
+#     python3 Benchmarks/async_node_bench.py [--nodes 100] [--probes 200] [--interface virtual]
+# On the virtual interface a can.Notifier still needs one reader thread per bus,
+# on socketcan (vcan0) it reads through the event loop with no extra threads.
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import struct
+import subprocess
+import sys
+import threading
+import time
+import can
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "MTD", "ECUs", "Airbag"))
+from can_node import CANNode, AsyncCANNode
+
+PROBE_ID = 0x100
+BROADCAST_ID = 0x200
+PROBE_GAP = 0.01
+
+def summarise(samples):
+    """
+    Handler latency statistics in microseconds.
+    """
+    us = sorted(s * 1e6 for s in samples)
+    return {
+        "count": len(us),
+        "median_us": statistics.median(us),
+        "p99_us": us[int(len(us) * 0.99) - 1],
+        "max_us": us[-1],
+    }
+
+def probe(sender):
+    """
+    Send a probe frame carrying its send time.
+    """
+    sender.send(can.Message(arbitration_id=PROBE_ID, data=struct.pack(">d", time.perf_counter()), is_extended_id=False))
+
+class ThreadedNode(CANNode):
+    def __init__(self, node_id, latencies, **kwargs):
+        super().__init__(node_id, **kwargs)
+        self.listen_ids = {PROBE_ID}
+        self.latencies = latencies
+        self.handle(PROBE_ID, self.on_probe)
+
+    def start(self):
+        super().start()
+
+        def loop():
+            while self.running:
+                self.send_message(BROADCAST_ID, [0x01])
+                time.sleep(1.0)
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def on_probe(self, msg):
+        self.latencies.append(time.perf_counter() - struct.unpack(">d", msg.data)[0])
+
+class AsyncNode(AsyncCANNode):
+    def __init__(self, node_id, latencies, **kwargs):
+        super().__init__(node_id, **kwargs)
+        self.listen_ids = {PROBE_ID}
+        self.latencies = latencies
+        self.handle(PROBE_ID, self.on_probe)
+
+    async def start(self):
+        self.every(1.0, self.broadcast)
+        await super().start()
+
+    async def broadcast(self):
+        self.send_message(BROADCAST_ID, [0x01])
+
+    async def on_probe(self, msg):
+        self.latencies.append(time.perf_counter() - struct.unpack(">d", msg.data)[0])
+
+def measure(latencies, base_rss):
+    """
+    Thread count, RSS growth and latency of the running nodes.
+    """
+    proc = psutil.Process()
+    return {
+        "os_threads": proc.num_threads(),
+        "rss_mib": (proc.memory_info().rss - base_rss) / 2**20,
+        "latency": summarise(latencies),
+    }
+
+def run_threaded(nodes, probes, channel, interface):
+    base_rss = psutil.Process().memory_info().rss
+    latencies = []
+    ecus = [ThreadedNode(f"BENCH NODE {n}", latencies, bus_name=channel, interface=interface) for n in range(nodes)]
+    for ecu in ecus:
+        ecu.start()
+    sender = can.interface.Bus(channel, interface=interface)
+    for _ in range(probes):
+        probe(sender)
+        time.sleep(PROBE_GAP)
+    time.sleep(0.5)
+    result = measure(latencies, base_rss)
+    sender.shutdown()
+    for ecu in ecus:
+        ecu.stop()
+    return result
+
+async def run_async(nodes, probes, channel, interface):
+    base_rss = psutil.Process().memory_info().rss
+    latencies = []
+    ecus = [AsyncNode(f"BENCH NODE {n}", latencies, bus_name=channel, interface=interface) for n in range(nodes)]
+    for ecu in ecus:
+        await ecu.start()
+    sender = can.interface.Bus(channel, interface=interface)
+    for _ in range(probes):
+        probe(sender)
+        await asyncio.sleep(PROBE_GAP)
+    await asyncio.sleep(0.5)
+    result = measure(latencies, base_rss)
+    sender.shutdown()
+    for ecu in ecus:
+        await ecu.stop()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Threaded vs asyncio CAN nodes")
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--interface", default="virtual", help="python-can interface (default: virtual)")
+    parser.add_argument("--child", choices=["threaded", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    channel = "vcan0" if args.interface == "socketcan" else "bench"
+
+    if args.child == "threaded":
+        print(json.dumps(run_threaded(args.nodes, args.probes, channel, args.interface)))
+        return
+    if args.child == "async":
+        print(json.dumps(asyncio.run(run_async(args.nodes, args.probes, channel, args.interface))))
+        return
+
+    results = {"nodes": args.nodes, "probes": args.probes, "interface": args.interface}
+    for layout in ("threaded", "async"):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", layout, "--nodes", str(args.nodes),
+             "--probes", str(args.probes), "--interface", args.interface],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[layout] = json.loads(out.splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
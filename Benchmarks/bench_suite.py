@@ -0,0 +1,221 @@
+# Benchmark suite comparing the Static and MTD vehicles
+# Measures, for each variant:
+#     - encrypt_id / decrypt_id / SlotIndex.lookup throughput (MTD only, Static IDs are unmasked)
+#     - on_message cost per ECU class, for frames the ECU listens to and for foreign frames
+#     - end-to-end latency of:
+#         crash:     0x001 crash command -> ForceSensorECU -> CrashDetectorECU -> AirbagECU deployed
+#         headlamp:  0x001 toggle -> HeadlightSwitchECU -> HeadlampECU state change
+# Results are written as JSON so releases can be compared for regressions.
+# Run from the repository root:
+#     python3 Benchmarks/bench_suite.py [--output results.json] [--interface virtual] [--channel bench]
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import can
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import ecu_loader
+
+VARIANTS = ("Static", "MTD")
+HANDLER_CALLS = 20_000
+CODEC_CALLS = 200_000
+E2E_TRIALS = 5
+E2E_TIMEOUT = 2.0
+FOREIGN_ID = 0x123
+
+def summarise(samples):
+    """
+    Summary statistics of a list of latencies in seconds, reported in milliseconds.
+    """
+    if not samples:
+        return {"count": 0}
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "count": len(ms),
+        "mean_ms": statistics.fmean(ms),
+        "median_ms": statistics.median(ms),
+        "min_ms": ms[0],
+        "max_ms": ms[-1],
+    }
+
+def codec_throughput():
+    """
+    Calls per second of the MTD ID masking functions.
+    """
+    mtd = sys.modules["mtd"]
+    now = time.time()
+    masked = mtd.encrypt_id(0x401)
+    index = mtd.SlotIndex({0x401: None, 0x402: None})
+
+    def rate(fn):
+        start = time.perf_counter()
+        for _ in range(CODEC_CALLS):
+            fn()
+        return CODEC_CALLS / (time.perf_counter() - start)
+
+    return {
+        "mode": mtd.MODE,
+        "hop_period": mtd.HOP_PERIOD,
+        "encrypt_id_per_s": rate(lambda: mtd.encrypt_id(0x401)),
+        "decrypt_id_per_s": rate(lambda: mtd.decrypt_id(masked, now, {0x401, 0x402})),
+        "slot_index_lookup_per_s": rate(lambda: index.lookup(masked, now)),
+    }
+
+def trigger_payloads(trie, prefix=()):
+    """
+    The payloads that reach each handler of a dispatch trie: its prefix, padded to 8 bytes.
+    """
+    payloads = []
+    for key, child in trie.items():
+        if key is None:
+            payloads.append(list(prefix) + [0x00] * (8 - len(prefix)))
+        else:
+            payloads += trigger_payloads(child, prefix + (key,))
+    return payloads
+
+def handler_costs(variant, interface, channel):
+    """
+    Mean on_message cost per ECU class, in microseconds.
+    ECUs are constructed but not started, so only the handler itself runs,
+    fed in turn the trigger payload of every handler it registered.
+    """
+    results = {}
+
+    for script in ecu_loader.variant_scripts(variant):
+        cls = ecu_loader.load_ecu_class(script)
+        ecu = cls(f"BENCH {variant} {cls.__name__}", bus_name=channel, interface=interface)
+        try:
+            now = time.time()
+            # The ECU's import has loaded mtd by now
+            encode = sys.modules["mtd"].encrypt_id if variant == "MTD" else (lambda i: i)
+            # One frame per registered handler, carrying the payload prefix that selects it
+            frames = [
+                can.Message(arbitration_id=encode(i), data=trigger, is_extended_id=False, timestamp=now)
+                for i in sorted(ecu.dispatch) for trigger in trigger_payloads(ecu.dispatch[i])
+            ]
+            foreign = can.Message(arbitration_id=FOREIGN_ID, data=[0x00] * 8, is_extended_id=False, timestamp=now)
+
+            start = time.perf_counter()
+            for n in range(HANDLER_CALLS):
+                ecu.on_message(frames[n % len(frames)])
+            listened_us = (time.perf_counter() - start) / HANDLER_CALLS * 1e6
+
+            start = time.perf_counter()
+            for _ in range(HANDLER_CALLS):
+                ecu.on_message(foreign)
+            foreign_us = (time.perf_counter() - start) / HANDLER_CALLS * 1e6
+        finally:
+            ecu.shutdown()
+
+        results[cls.__name__] = {"listened_us": listened_us, "foreign_us": foreign_us}
+
+    return results
+
+def wait_for(condition, timeout):
+    """
+    Spin until condition() is true; returns the time it became true, or None on timeout.
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if condition():
+            return time.perf_counter()
+        time.sleep(0.0002)
+    return None
+
+def end_to_end(variant, interface, channel):
+    """
+    Latency of the crash and headlamp paths through running ECUs.
+    """
+    def start(name):
+        cls = ecu_loader.load_ecu_class(f"{variant}/ECUs/{name}")
+        ecu = cls(f"BENCH {variant} {cls.__name__}", bus_name=channel, interface=interface)
+        ecu.start()
+        return ecu
+
+    ecus = {
+        "force": start("ForceSensor/force_sensor_ecu.py"),
+        "crash": start("CrashDetector/crash_detector_ecu.py"),
+        "airbag": start("Airbag/airbag_ecu.py"),
+        "switch": start("HeadlampSwitch/headlamp_switch_ecu.py"),
+        "headlamp": start("Headlamp/headlamp_ecu.py"),
+    }
+    bus = can.interface.Bus(channel, interface=interface)
+    crash_cmd = can.Message(arbitration_id=0x001, data=[0x03], is_extended_id=False)
+    toggle_cmd = can.Message(arbitration_id=0x001, data=[0x02], is_extended_id=False)
+
+    try:
+        # The switch learns the headlamp state from its first status broadcast
+        wait_for(lambda: hasattr(ecus["switch"], "headlight_state_on"), E2E_TIMEOUT)
+
+        crash, headlamp, misses = [], [], 0
+        for _ in range(E2E_TRIALS):
+            airbag = ecus["airbag"]
+            airbag.status = 0x00
+            sent = time.perf_counter()
+            bus.send(crash_cmd)
+            done = wait_for(lambda: airbag.status == 0x01, E2E_TIMEOUT)
+            if done is None:
+                misses += 1
+            else:
+                crash.append(done - sent)
+
+            lamp = ecus["headlamp"]
+            before = lamp.headlight_state
+            sent = time.perf_counter()
+            bus.send(toggle_cmd)
+            done = wait_for(lambda: lamp.headlight_state != before, E2E_TIMEOUT)
+            if done is None:
+                misses += 1
+            else:
+                headlamp.append(done - sent)
+
+            # Let the crash detector's redeploy cooldown and the next status broadcast pass
+            time.sleep(1.2)
+    finally:
+        bus.shutdown()
+        for ecu in ecus.values():
+            ecu.shutdown()
+
+    return {"crash": summarise(crash), "headlamp": summarise(headlamp), "misses": misses}
+
+def main():
+    parser = argparse.ArgumentParser(description="Static vs MTD benchmark suite")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--interface", default="virtual", help="python-can interface (default: virtual)")
+    parser.add_argument("--channel", default="bench", help="bus channel (default: bench)")
+    args = parser.parse_args()
+
+    results = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "python_can": can.__version__,
+        "interface": args.interface,
+        "variants": {},
+    }
+
+    # ECUs print their state changes, keep them out of the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for variant in VARIANTS:
+            results["variants"][variant] = {
+                "handlers": handler_costs(variant, args.interface, args.channel),
+                "end_to_end": end_to_end(variant, args.interface, args.channel),
+            }
+        results["variants"]["MTD"]["codec"] = codec_throughput()
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
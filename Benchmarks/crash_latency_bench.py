@@ -0,0 +1,95 @@
+# Measures crash-to-deploy latency of the CrashDetector ECU
+# Sends crash G-force readings on 0x401 and times the 0x402 deploy command they trigger.
+# "event" is the CrashDetectorECU as shipped, which evaluates each reading on receipt;
+# "polling" reproduces the previous monitor thread that checked the latest reading every 100 ms.
+# Run from the repository root:
+#     python3 Benchmarks/crash_latency_bench.py [--variant Static] [--crashes 20] [--interface virtual]
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import can
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import ecu_loader
+
+DEPLOY = [0xDE, 0x99]
+
+def polling_detector(base, encode):
+    """
+    The CrashDetectorECU with its former 100 ms polling monitor, for comparison.
+    """
+    class PollingCrashDetectorECU(base):
+        def on_force(self, msg):
+            self.latest_force = msg.data[0]
+
+        def start(self):
+            super().start()
+
+            def monitor():
+                while self.running:
+                    if self.latest_force > self.threshold:
+                        self.send_message(encode(self.broadcast_id), DEPLOY)
+                        time.sleep(1.0)
+                    time.sleep(0.1)
+
+            threading.Thread(target=monitor, daemon=True).start()
+
+    return PollingCrashDetectorECU
+
+def measure(ecu_class, args, encode, channel):
+    """
+    Crash-to-deploy latencies in milliseconds for one detector implementation.
+    """
+    ecu = ecu_class("BENCH CRASH DETECTOR ECU", bus_name=channel, interface=args.interface)
+    ecu.start()
+    bus = can.Bus(channel, interface=args.interface)
+    latencies = []
+
+    for _ in range(args.crashes):
+        # Clear the reading from the previous crash and wait out the redeploy cooldown
+        bus.send(can.Message(arbitration_id=encode(0x401), data=[10, 0x2A], is_extended_id=False))
+        time.sleep(1.2 + random.uniform(0.0, 0.1))
+        while bus.recv(timeout=0) is not None:
+            pass
+
+        sent = time.perf_counter()
+        bus.send(can.Message(arbitration_id=encode(0x401), data=[90, 0x2A], is_extended_id=False))
+        deadline = sent + 1.0
+        while time.perf_counter() < deadline:
+            msg = bus.recv(timeout=deadline - time.perf_counter())
+            if msg is not None and list(msg.data) == DEPLOY:
+                latencies.append((time.perf_counter() - sent) * 1e3)
+                break
+
+    ecu.shutdown()
+    bus.shutdown()
+    return {
+        "deploys": len(latencies),
+        "median_ms": round(statistics.median(latencies), 3) if latencies else None,
+        "max_ms": round(max(latencies), 3) if latencies else None,
+    }
+
+def run(args):
+    channel = "vcan0" if args.interface == "socketcan" else "bench"
+    ecu_class = ecu_loader.load_ecu_class(os.path.join(args.variant, "ECUs", "CrashDetector", "crash_detector_ecu.py"))
+    encode = sys.modules["mtd"].encrypt_id if args.variant == "MTD" else (lambda can_id: can_id)
+    return {
+        "variant": args.variant,
+        "crashes": args.crashes,
+        "polling": measure(polling_detector(ecu_class, encode), args, encode, channel),
+        "event": measure(ecu_class, args, encode, channel),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CrashDetector crash-to-deploy latency")
+    parser.add_argument("--variant", choices=("Static", "MTD"), default="Static")
+    parser.add_argument("--crashes", type=int, default=20)
+    parser.add_argument("--interface", default="socketcan")
+    print(json.dumps(run(parser.parse_args()), indent=2))
@@ -0,0 +1,119 @@
+# Compares process-per-ECU against one ECU host per variant
+# Launches all 24 ECUs both ways and reports the time until every ECU has started
+# and the summed memory of the processes (RSS, plus PSS/USS where the platform reports them).
+# Run from the repository root:
+#     python3 Benchmarks/ecu_host_bench.py [--interface virtual] [--runs 3]
+# With --interface socketcan the ECUs use vcan0 as in a normal ignition run.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import ecu_loader
+
+VARIANTS = ("Static", "MTD")
+READY = "BENCH READY"
+
+def child(layout, target, interface):
+    """
+    Start one ECU script ("process") or one variant host ("host"), report readiness and idle.
+    """
+    channel = "vcan0" if interface == "socketcan" else "bench"
+    if layout == "host":
+        import ecu_host
+        node = ecu_host.ECUHost(ecu_loader.variant_scripts(target), channel=channel, interface=interface)
+    else:
+        node = ecu_loader.load_ecu_class(target)("BENCH ECU", bus_name=channel, interface=interface)
+    node.start()
+    print(READY, flush=True)
+    while True:
+        time.sleep(1.0)
+
+def memory(procs):
+    """
+    Summed memory of the processes in MiB.
+    """
+    totals = {"rss_mib": 0.0}
+    for proc in procs:
+        ps = psutil.Process(proc.pid)
+        try:
+            info = ps.memory_full_info()
+            for field in ("rss", "pss", "uss"):
+                if hasattr(info, field):
+                    key = f"{field}_mib"
+                    totals[key] = totals.get(key, 0.0) + getattr(info, field) / 2**20
+        except psutil.AccessDenied:
+            totals["rss_mib"] += ps.memory_info().rss / 2**20
+    return totals
+
+def run(layout, interface):
+    """
+    Launch every ECU in the given layout; returns startup time and memory.
+    """
+    if layout == "host":
+        targets = list(VARIANTS)
+    else:
+        targets = [script for variant in VARIANTS for script in ecu_loader.variant_scripts(variant)]
+
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--child", layout, target, "--interface", interface],
+            cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        for target in targets
+    ]
+    try:
+        for proc in procs:
+            for line in proc.stdout:
+                if line.startswith(READY):
+                    break
+            else:
+                raise RuntimeError(f"{layout} child exited before starting (code {proc.wait()})")
+        startup = time.perf_counter() - start
+        time.sleep(0.5)
+        result = {"processes": len(procs), "startup_s": startup}
+        result.update(memory(procs))
+        return result
+    finally:
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Process-per-ECU vs ECU host")
+    parser.add_argument("--interface", default="virtual", help="python-can interface (default: virtual)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", nargs=2, metavar=("LAYOUT", "TARGET"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.interface)
+        return
+
+    # Share one mask table between the MTD ECUs as ignition does
+    os.environ.setdefault("MTD_SHM_NAME", f"mtd_host_bench_{os.getpid()}")
+    import mtd
+    shm = mtd.publish_mask_table(os.environ["MTD_SHM_NAME"])
+
+    try:
+        results = {}
+        for layout in ("process", "host"):
+            runs = [run(layout, args.interface) for _ in range(args.runs)]
+            results[layout] = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+            results[layout]["processes"] = runs[0]["processes"]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
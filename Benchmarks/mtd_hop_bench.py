@@ -0,0 +1,104 @@
+# Sweeps the MTD hop period (MTD_HOP_PERIOD) and reports, per period:
+#     - import time of mtd (deriving the mask table without a cache)
+#     - receive-path CPU cost per frame, summed over the 12 MTD ECUs' SlotIndex lookups
+#     - mis-decode rate when decoding with the clock at handling time (decrypt_id without a timestamp)
+#     - mis-decode rate when routing on the frame timestamp with previous-slot tolerance (SlotIndex)
+# Frames are simulated: each is masked at its send time, timestamped by the kernel
+# shortly after, and handled after an exponentially distributed queueing delay.
+# Run from the repository root: python3 Benchmarks/mtd_hop_bench.py
+
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PERIODS = [0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0]
+FRAMES = 50_000
+FRAME_GAP = 0.002           # Seconds between frames on the bus
+KERNEL_DELAY = 0.00005      # Send to kernel receive timestamp
+QUEUE_DELAY_MEAN = 0.001    # Kernel timestamp to handler
+
+# IDs each MTD ECU listens to
+MTD_LISTEN_IDS = [
+    {0x402, 0x501},                     # Airbag
+    {0x001},                            # Battery
+    {0x401},                            # CrashDetector
+    {0x001},                            # EngineControl
+    {0x001},                            # ForceSensor
+    {0x001},                            # FuelSystem
+    {0x201},                            # Headlamp
+    {0x001, 0x301},                     # HeadlampSwitch
+    {0x001},                            # IndicatorSwitch
+    {0x601},                            # LeftIndicator
+    {0x601},                            # RightIndicator
+    {0x001, 0x701, 0x702, 0x703},       # StarterMotor
+]
+BROADCAST_IDS = sorted(set().union(*MTD_LISTEN_IDS) - {0x001})
+
+def measure():
+    """
+    Run inside a child interpreter with MTD_HOP_PERIOD set and print one JSON result.
+    """
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import mtd
+    import_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(0)
+    t0 = time.time()
+    frames = []
+    for n in range(FRAMES):
+        sent = t0 + n * FRAME_GAP
+        base_id = rng.choice(BROADCAST_IDS)
+        masked = base_id ^ mtd.MASK_TABLE[mtd.slot_at(sent)]
+        stamped = sent + KERNEL_DELAY
+        handled = stamped + rng.expovariate(1 / QUEUE_DELAY_MEAN)
+        frames.append((base_id, masked, stamped, handled))
+
+    # Clock at handling time, as the ECUs decoded before frame timestamps were used
+    wall_errors = sum(
+        1 for base_id, masked, _, handled in frames
+        if masked ^ mtd.MASK_TABLE[mtd.slot_at(handled)] != base_id
+    )
+
+    indexes = [(ids, mtd.SlotIndex({i: None for i in ids})) for ids in MTD_LISTEN_IDS]
+    index_errors = 0
+    start = time.process_time()
+    for base_id, masked, stamped, _ in frames:
+        for ids, index in indexes:
+            route = index.lookup(masked, stamped)
+            if base_id in ids and (route is None or route[0] != base_id):
+                index_errors += 1
+    cpu = time.process_time() - start
+
+    listeners = sum(1 for base_id, *_ in frames for ids in MTD_LISTEN_IDS if base_id in ids)
+    print(json.dumps({
+        "period": mtd.HOP_PERIOD,
+        "slots": mtd.SLOTS,
+        "import_ms": import_ms,
+        "cpu_us_per_frame": cpu / FRAMES * 1e6,
+        "wall_clock_misdecode": wall_errors / FRAMES,
+        "slot_index_misdecode": index_errors / listeners,
+    }))
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        measure()
+        sys.exit(0)
+
+    env = dict(os.environ)
+    env.pop("MTD_MASK_CACHE", None)
+    env["MTD_SHM_NAME"] = f"mtd_hop_bench_{os.getpid()}"  # Never map a live simulator's table
+
+    print(f"{'period (s)':>10} {'slots':>8} {'import (ms)':>12} {'CPU/frame (us)':>15} {'mis-decode clock':>17} {'mis-decode index':>17}")
+    for period in PERIODS:
+        env["MTD_HOP_PERIOD"] = str(period)
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"], env=env,
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout)
+        print(f"{r['period']:>10} {r['slots']:>8} {r['import_ms']:>12.1f} {r['cpu_us_per_frame']:>15.2f} "
+              f"{r['wall_clock_misdecode']:>16.3%} {r['slot_index_misdecode']:>16.3%}")
@@ -0,0 +1,81 @@
+# Compares the two MTD masking modes (MTD_MODE=xor and MTD_MODE=perm):
+#     - encrypt_id and decrypt_id(timestamp) throughput
+#     - SlotIndex.lookup throughput (the ECU receive path)
+#     - cost of deriving one slot's tables (mask lookup vs keyed permutation)
+#     - collisions over one hourly cycle: slots where a base ID in use is sent
+#       as the control ID 0x001 or as another reserved (Static) base ID
+# Run from the repository root: python3 Benchmarks/mtd_perm_bench.py
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CALLS = 200_000
+BASE_IDS = [0x201, 0x301, 0x401, 0x402, 0x501, 0x601, 0x602, 0x603, 0x701, 0x702, 0x703, 0x704]
+
+def rate(fn):
+    """
+    Calls per second of fn over CALLS iterations.
+    """
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        fn()
+    return CALLS / (time.perf_counter() - start)
+
+def measure():
+    """
+    Run inside a child interpreter with MTD_MODE set and print one JSON result.
+    """
+    sys.path.insert(0, ROOT)
+    import mtd
+
+    now = time.time()
+    masked = mtd.encrypt_id(0x401)
+    index = mtd.SlotIndex({base_id: None for base_id in BASE_IDS})
+
+    start = time.perf_counter()
+    for slot in range(100):
+        if mtd.MODE == "perm":
+            mtd._build_permutation(slot)
+        else:
+            mtd.MASK_TABLE[slot]
+    build_us = (time.perf_counter() - start) / 100 * 1e6
+
+    collisions = 0
+    for slot in range(mtd.SLOTS):
+        for base_id in BASE_IDS:
+            if mtd._encode(base_id, slot) in mtd.RESERVED_IDS:
+                collisions += 1
+        if mtd.MODE == "perm":
+            mtd._permutations[slot % 4] = (None, None)  # Keep the cache from growing the run's memory
+
+    print(json.dumps({
+        "mode": mtd.MODE,
+        "encrypt_per_s": rate(lambda: mtd.encrypt_id(0x401)),
+        "decrypt_per_s": rate(lambda: mtd.decrypt_id(masked, now)),
+        "lookup_per_s": rate(lambda: index.lookup(masked, now)),
+        "slot_build_us": build_us,
+        "collisions": collisions,
+        "slot_ids": mtd.SLOTS * len(BASE_IDS),
+    }))
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        measure()
+        sys.exit(0)
+
+    env = dict(os.environ)
+    env["MTD_SHM_NAME"] = f"mtd_perm_bench_{os.getpid()}"
+
+    print(f"{'mode':<6} {'encrypt/s':>12} {'decrypt/s':>12} {'lookup/s':>12} {'slot build (us)':>16} {'collisions / hour':>20}")
+    for mode in ("xor", "perm"):
+        env["MTD_MODE"] = mode
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"], env=env,
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout)
+        print(f"{r['mode']:<6} {r['encrypt_per_s']:>12,.0f} {r['decrypt_per_s']:>12,.0f} {r['lookup_per_s']:>12,.0f} "
+              f"{r['slot_build_us']:>16.1f} {r['collisions']:>9} of {r['slot_ids']}")
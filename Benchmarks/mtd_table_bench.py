@@ -0,0 +1,82 @@
+# Reports the cost of building the full-cycle MTD mask table
+#     - time to derive all 3600 masks with one batched AES-ECB call
+#     - time to load the same table from a cache file (MTD_MASK_CACHE)
+#     - memory footprint of the table
+#     - time and peak RSS of "import mtd" in a fresh interpreter when it derives the
+#       table itself, loads it from the cache file, or maps the shared memory segment
+# Run from the repository root: python3 Benchmarks/mtd_table_bench.py
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import mtd
+
+REPEATS = 20
+
+def best_of(fn, repeats=REPEATS):
+    """
+    Return the fastest of several timed calls, in milliseconds.
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def import_cost(env):
+    """
+    Time "import mtd" in a fresh interpreter.
+    Returns (milliseconds, peak RSS in MB).
+    """
+    code = ("import resource, time; s = time.perf_counter(); import mtd; "
+            "print(time.perf_counter() - s, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    seconds, maxrss_kb = out.stdout.split()
+    return float(seconds) * 1000, int(maxrss_kb) / 1024
+
+def best_import(env, repeats=5):
+    """
+    Fastest of several fresh-interpreter imports.
+    """
+    return min(import_cost(env) for _ in range(repeats))
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "mtd_masks.bin")
+        mtd.load_mask_table(cache_path)  # Populate the cache
+
+        build_ms = best_of(mtd._build_mask_table)
+        load_ms = best_of(lambda: mtd.load_mask_table(cache_path))
+
+        env = dict(os.environ)
+        env.pop(mtd.MASK_CACHE_ENV, None)
+        env[mtd.SHM_NAME_ENV] = f"mtd_bench_{os.getpid()}"
+        cold_ms, cold_rss = best_import(env)
+        env[mtd.MASK_CACHE_ENV] = cache_path
+        cached_ms, cached_rss = best_import(env)
+
+        shm = mtd.publish_mask_table(env[mtd.SHM_NAME_ENV])
+        try:
+            shared_ms, shared_rss = best_import(env)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    table = mtd.MASK_TABLE
+    payload_bytes = table.buffer_info()[1] * table.itemsize
+
+    print(f"Mask table: {len(table)} slots")
+    print(f"{'build (batched AES)':<28} -> {build_ms:8.2f} ms")
+    print(f"{'load from cache file':<28} -> {load_ms:8.2f} ms")
+    print(f"{'import mtd (no cache)':<28} -> {cold_ms:8.2f} ms, {cold_rss:6.2f} MB peak RSS")
+    print(f"{'import mtd (cache file)':<28} -> {cached_ms:8.2f} ms, {cached_rss:6.2f} MB peak RSS")
+    print(f"{'import mtd (shared memory)':<28} -> {shared_ms:8.2f} ms, {shared_rss:6.2f} MB peak RSS")
+    print(f"{'table payload':<28} -> {payload_bytes / 1024:8.2f} KiB")
+    print(f"{'table object (getsizeof)':<28} -> {sys.getsizeof(table) / 1024:8.2f} KiB")
@@ -0,0 +1,92 @@
+# Compares starting every ECU as a fresh interpreter against forking them from a warm launcher
+# Launches the 24 ECUs both ways through ecu_launcher and reports the time until all of them
+# signalled readiness and their summed memory (RSS, PSS, USS).
+# Run from the repository root:
+#     python3 Benchmarks/prefork_bench.py [--interface virtual] [--runs 3]
+# The ECU scripts run as in ignition, on vcan0 with socketcan or on the "bench" channel of
+# another interface through their --interface and --channel options.
+# Each run is a separate child so the fork launcher starts from a cold interpreter too.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import ecu_launcher
+import ecu_loader
+
+VARIANTS = ("Static", "MTD")
+
+def targets(interface):
+    """
+    (name, args) of one process per ECU.
+    """
+    for variant in VARIANTS:
+        for script in ecu_loader.variant_scripts(variant):
+            channel = "vcan0" if interface == "socketcan" else "bench"
+            yield script, (script, "--interface", interface, "--channel", channel)
+
+def child(launcher, interface):
+    """
+    Launch every ECU with one launcher and print the figures as JSON.
+    """
+    start = time.perf_counter()
+    if launcher == "fork":
+        ecu_launcher.warm_imports()
+        start_ecu = ecu_launcher.fork
+    else:
+        start_ecu = ecu_launcher.spawn
+    launches = [start_ecu(name, args, cwd=ROOT) for name, args in targets(interface)]
+    try:
+        missing = ecu_launcher.wait_ready(launches, timeout=30.0)
+        ready = time.perf_counter() - start
+        time.sleep(0.5)
+        result = {"processes": len(launches), "not_ready": len(missing), "time_to_ready_s": ready}
+        result.update({f"{field}_mib": mib for field, mib in ecu_launcher.summed_memory(launches).items()})
+    finally:
+        for launch in launches:
+            launch.proc.kill()
+            launch.proc.wait()
+    print(json.dumps(result))
+
+def run(launcher, interface):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", launcher, "--interface", interface],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Fresh interpreters vs forked ECUs")
+    parser.add_argument("--interface", default="socketcan")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", choices=("fork", "spawn"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.interface)
+        return
+
+    # Share one mask table between the MTD ECUs as ignition does
+    os.environ.setdefault("MTD_SHM_NAME", f"mtd_prefork_bench_{os.getpid()}")
+    import mtd
+    shm = mtd.publish_mask_table(os.environ["MTD_SHM_NAME"])
+
+    try:
+        results = {}
+        for launcher in ("spawn", "fork"):
+            runs = [run(launcher, args.interface) for _ in range(args.runs)]
+            results[launcher] = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+    finally:
+        shm.close()
+        shm.unlink()
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Checks that the StarterMotor ECU keeps receiving while its 0x704 result is pending
+# Plays a valid startup sequence (0x001 start, then 0x701/0x702/0x703 at 1, 2 and 3 s) and sends
+# probe frames on 0x701 both before the sequence and during the 1 s delay before 0x704.
+# Reports the handler latency of both probe sets and when the result arrived.
+# Run from the repository root:
+#     python3 Benchmarks/starter_delay_bench.py [--variant Static] [--probes 50] [--interface virtual]
+# When the delay slept on the receive thread, probes in the window waited up to a second.
+
+import argparse
+import json
+import os
+import sys
+import time
+import can
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import ecu_loader
+
+START = [0x07]
+BATTERY_STARTUP = [0xB1, 0x55, 0x8F, 0x01]
+FUEL_STARTUP =    [0xF1, 0x55, 0x8F, 0x01]
+ENGINE_STARTUP =  [0xEC, 0x55, 0x8F, 0x01]
+RESULTS = ([0xAA, 0x11], [0xFF, 0xFF])
+PROBE = [0x00, 0x00, 0x00, 0x7F]
+
+def send_probes(bus, encode, count, gap):
+    """
+    Voltage frames on 0x701, which the ECU receives and ignores outside a sequence.
+    """
+    for _ in range(count):
+        bus.send(can.Message(arbitration_id=encode(0x701), data=PROBE, is_extended_id=False))
+        time.sleep(gap)
+
+def run(args):
+    channel = "vcan0" if args.interface == "socketcan" else "bench"
+    ecu_class = ecu_loader.load_ecu_class(os.path.join(args.variant, "ECUs", "StarterMotor", "starter_motor_ecu.py"))
+    encode = sys.modules["mtd"].encrypt_id if args.variant == "MTD" else (lambda can_id: can_id)
+    ecu = ecu_class("BENCH STARTER MOTOR ECU", bus_name=channel, interface=args.interface)
+    ecu.start()
+    bus = can.Bus(channel, interface=args.interface)
+    gap = args.window / args.probes
+
+    send_probes(bus, encode, args.probes, gap)
+    time.sleep(0.1)
+    baseline = ecu.handler_latency.summary()
+    ecu.handler_latency = type(ecu.handler_latency)()
+
+    start = time.time()
+    bus.send(can.Message(arbitration_id=encode(0x001), data=START, is_extended_id=False))
+    for offset, base_id, payload in ((1.0, 0x701, BATTERY_STARTUP), (2.0, 0x702, FUEL_STARTUP), (3.0, 0x703, ENGINE_STARTUP)):
+        time.sleep(max(0.0, start + offset - time.time()))
+        bus.send(can.Message(arbitration_id=encode(base_id), data=payload, is_extended_id=False))
+    completed = time.time()
+    # Let the sequence frames be handled, then measure only the probes in the delay
+    time.sleep(0.05)
+    ecu.handler_latency = type(ecu.handler_latency)()
+
+    send_probes(bus, encode, args.probes, gap)
+    result = None
+    deadline = completed + 3.0
+    while result is None and time.time() < deadline:
+        msg = bus.recv(timeout=0.1)
+        if msg is not None and list(msg.data) in RESULTS:
+            result = msg
+    ecu.shutdown()
+    bus.shutdown()
+    return {
+        "variant": args.variant,
+        "baseline_probes": baseline,
+        "delay_window_probes": ecu.handler_latency.summary(),
+        "result": list(result.data) if result else None,
+        "result_delay_s": round(result.timestamp - completed, 3) if result else None,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="StarterMotor reception during the 0x704 delay")
+    parser.add_argument("--variant", choices=("Static", "MTD"), default="Static")
+    parser.add_argument("--probes", type=int, default=50)
+    parser.add_argument("--window", type=float, default=0.7, help="Seconds over which each probe set is spread")
+    parser.add_argument("--interface", default="socketcan")
+    print(json.dumps(run(parser.parse_args()), indent=2))
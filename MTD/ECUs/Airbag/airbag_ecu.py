@@ -3,12 +3,11 @@
 # Periodically broadcasts 0x501 airbag status every 1s
 # CAN IDs dynamically encrypted
 
-import threading
 import signal
 import sys
 import time
 from can_node import CANNode
-from mtd import encrypt_id, decrypt_id
+from mtd import encrypt_id, next_boundary, SlotIndex, HOP_PERIOD
 
 DEPLOY = [0xDE, 0x99]
 
@@ -22,6 +21,11 @@ class AirbagECU(CANNode):
         self.listen_crash = 0x402
         self.listen_status = 0x501
         self.broadcast_status = 0x501
+        self.status_broadcast = self.cyclic(self.broadcast_status, [self.status, 0xDE], encode=encrypt_id, hop=HOP_PERIOD, boundary=next_boundary)
+        self.handle(self.listen_crash, self.on_crash, DEPLOY)
+        self.handle(self.listen_status, self.on_status)
+        self.id_index = SlotIndex(self.dispatch)
+        self.filter_period = HOP_PERIOD
 
     def start(self):
         """
@@ -30,47 +34,59 @@ class AirbagECU(CANNode):
         super().start()
         self.start_status_broadcast()
 
-    def on_message(self, msg):
+    def on_crash(self, msg):
         """
-        Process incoming CAN messages:
-        - Crash detector trigger (0x402)
-        - Status update messages (0x501)
+        Deploy on a crash detector trigger (0x402).
         """
-        if decrypt_id(msg.arbitration_id) == self.listen_crash and list(msg.data[0:2]) == DEPLOY:
-            if self.status == 0x01:
-                print(f"[MTD AIRBAG ECU] Airbag already deployed.")
-                return
+        if self.status == 0x01:
+            print(f"[MTD AIRBAG ECU] Airbag already deployed.")
+            return
 
-            self.status = 0x01
-            self.last_deploy_time = time.time()
-            print(f"[MTD AIRBAG ECU] AIRBAG DEPLOYED!")
+        self.last_deploy_time = time.time()
+        self.set_status(0x01)
+        print(f"[MTD AIRBAG ECU] AIRBAG DEPLOYED!")
 
-        # This is for demonstration purposes to allow spoofing
-        elif decrypt_id(msg.arbitration_id) == self.listen_status:
-            incoming_status = msg.data[0]
-            self.status = incoming_status
+    def on_status(self, msg):
+        """
+        Adopt status updates (0x501).
+        This is for demonstration purposes to allow spoofing
+        Our own broadcasts looped back on the same ID are ignored, otherwise an old
+        status still in flight could undo a deployment.
+        """
+        if self.status_broadcast.is_echo(msg):
+            return
+        incoming_status = msg.data[0]
+        self.set_status(incoming_status)
 
-    def start_status_broadcast(self):
+    def set_status(self, status):
         """
-        Periodically broadcast airbag status
+        Change the airbag status and the broadcast payload.
         """
-        def loop():
-            while self.running:
-                # Auto-reset status after cooldown
-                if self.status == 0x01 and (time.time() - self.last_deploy_time > self.cooldown):
-                    self.status = 0x00
+        self.status = status
+        self.status_broadcast.update([self.status, 0xDE])
 
-                self.send_message(encrypt_id(self.broadcast_status), [self.status] + [0xDE])
-                time.sleep(1.0)
+    def reset_status(self):
+        """
+        Auto-reset status after cooldown, checked every broadcast period.
+        """
+        if self.status == 0x01 and time.time() - self.last_deploy_time > self.cooldown:
+            self.set_status(0x00)
 
-        threading.Thread(target=loop, daemon=True).start()
+    def start_status_broadcast(self):
+        """
+        Periodically broadcast airbag status
+        The payload is only updated when the status changes, the ID follows the mask rotation.
+        """
+        self.status_broadcast.start()
+        # The cooldown is checked on its own periodic job, the broadcast only carries the frame
+        self.every(self.period, self.reset_status)
 
     def shutdown(self):
         self.running = False
         self.stop()
 
 if __name__ == "__main__":
-    ecu = AirbagECU("MTD AIRBAG ECU", bus_name="vcan0")
+    ecu = AirbagECU.from_args("MTD AIRBAG ECU")
 
     def handle_sigint(sig, frame):
         ecu.shutdown()
@@ -79,6 +95,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
@@ -3,13 +3,12 @@
 # If ON: Waits 1.0s, stops voltage broadcast and signals shutdown
 # CAN IDs dynamically encrypted
 
-import threading
 import signal
 import sys
 import time
 import random
 from can_node import CANNode
-from mtd import encrypt_id, decrypt_id 
+from mtd import encrypt_id, SlotIndex, HOP_PERIOD
 
 #CAN Payloads
 COMMAND_CONTROL = 0x07
@@ -21,6 +20,9 @@ class BatteryECU(CANNode):
         super().__init__(node_id, **kwargs)
         self.broadcast_id = 0x701           # ID for readiness and voltage
         self.control_id = 0x001             # Ignition startup/shutdown command
+        self.handle(self.control_id, self.on_control, [COMMAND_CONTROL])
+        self.id_index = SlotIndex(self.dispatch)
+        self.filter_period = HOP_PERIOD
         self.running = True
         self.started = False
 
@@ -28,15 +30,14 @@ class BatteryECU(CANNode):
         super().start()
         self.start_voltage_broadcast_loop()
 
-    def on_message(self, msg):
+    def on_control(self, msg):
         """
-       Toggle between startup and shutdown
+        Ignition command (0x001): start up or shut down after the readiness delay.
         """
-        if decrypt_id(msg.arbitration_id) == self.control_id and msg.data[0] == COMMAND_CONTROL:
-            if not self.started:
-                threading.Timer(1.0, self._handle_startup).start()
-            else:
-                threading.Timer(1.0, self._handle_shutdown).start()
+        if not self.started:
+            self.after(1.0, self._handle_startup)
+        else:
+            self.after(1.0, self._handle_shutdown)
 
     def _handle_startup(self):
         """
@@ -59,21 +60,19 @@ class BatteryECU(CANNode):
         Broadcasts voltage only when system is 'started'.
         """
         def loop():
-            if self.running:
-                if self.started:
-                    voltage = random.randint(115, 125)  # Random voltage
-                    encrypted_id = encrypt_id(self.broadcast_id)
-                    self.send_message(encrypted_id, [0]*3 + [voltage])
-                threading.Timer(1.0, loop).start()
+            if self.started:
+                voltage = random.randint(115, 125)  # Random voltage
+                encrypted_id = encrypt_id(self.broadcast_id)
+                self.send_message(encrypted_id, [0]*3 + [voltage])
 
-        loop()
+        self.every(self.period, loop)
 
     def shutdown(self):
         self.running = False
         self.stop()
 
 if __name__ == "__main__":
-    ecu = BatteryECU("MTD BATTERY ECU", bus_name="vcan0")
+    ecu = BatteryECU.from_args("MTD BATTERY ECU")
 
     def handle_sigint(sig, frame):
 
@@ -83,6 +82,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
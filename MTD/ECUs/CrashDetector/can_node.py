@@ -1,41 +1,704 @@
 
+import argparse
+import asyncio
+import collections
+import heapq
+import inspect
+import itertools
+import os
+import select
+import socket
+import struct
 import can
 import threading
+import time
+
+# Linux socket options used by the raw socketcan receive path
+SO_TIMESTAMPNS = 35             # Kernel receive timestamp with each frame
+SO_RXQ_OVFL = 40                # Count of frames the socket dropped because its queue was full
+CANFD_MTU = 72
+RX_ANCILLARY_SIZE = socket.CMSG_SPACE(16) + socket.CMSG_SPACE(4)
+
+def notify_ready():
+    """
+    Tell the launcher this process is listening, through the pipe it passed in ECU_READY_FD.
+    Only the first call in a process reports.
+    """
+    fd = os.environ.pop("ECU_READY_FD", None)
+    if fd is None:
+        return
+    try:
+        os.write(int(fd), b"ready\n")
+        os.close(int(fd))
+    except (OSError, ValueError):
+        pass
+
+class Job:
+    """A scheduled callback; period is None for one-shot jobs."""
+    def __init__(self, callback, period):
+        self.callback = callback
+        self.period = period
+        self.active = True
+
+    def cancel(self):
+        """Drop the job before its next run."""
+        self.active = False
+
+class Scheduler:
+    """
+    Heap of absolute deadlines served by a single thread. Periodic jobs are re-armed
+    from their previous deadline, not from when the callback finished, so they do
+    not drift. Started on first use and shared by every node in the process.
+    """
+    def __init__(self):
+        self._heap = []                             # (deadline, sequence, job)
+        self._sequence = itertools.count()
+        self._wakeup = threading.Condition()
+        self._thread = None
+
+    def every(self, period, callback, delay=0.0):
+        """Run callback every period seconds, the first time after delay."""
+        return self._add(Job(callback, period), delay)
+
+    def after(self, delay, callback):
+        """Run callback once after delay seconds."""
+        return self._add(Job(callback, None), delay)
+
+    def _add(self, job, delay):
+        with self._wakeup:
+            self._push(time.monotonic() + delay, job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+        return job
+
+    def _push(self, deadline, job):
+        heapq.heappush(self._heap, (deadline, next(self._sequence), job))
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._wakeup.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                deadline, _, job = heapq.heappop(self._heap)
+                if not job.active:
+                    continue
+                if job.period is None:
+                    job.active = False
+                else:
+                    # Skip missed periods rather than bursting to catch up
+                    deadline += job.period * max(1, -(-(time.monotonic() - deadline) // job.period))
+                    self._push(deadline, job)
+
+            try:
+                job.callback()
+            except Exception as e:
+                print(f"[Scheduler] Warning: Job {getattr(job.callback, '__qualname__', job.callback)} failed — {e}")
+
+scheduler = Scheduler()
+
+class LatencyStats:
+    """
+    Running latency figures: count, mean and max over everything recorded, and
+    percentiles over the most recent samples.
+    """
+    def __init__(self, window=1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = collections.deque(maxlen=window)
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary(self):
+        """Figures in microseconds."""
+        recent = sorted(self.recent)
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(len(recent) * p))] * 1e6 if recent else 0.0
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "p50_us": percentile(0.50),
+            "p99_us": percentile(0.99),
+            "max_us": self.max * 1e6,
+        }
+
+class TxQueue:
+    """
+    Frames waiting for the bus, written by a dedicated writer thread so that handlers and
+    timers never block in bus.send. What happens when high_water frames are already queued
+    depends on the policy of the frame:
+        "block"    - the sender waits for room (default)
+        "drop"     - the new frame is discarded
+        "coalesce" - a queued frame with the same key is overwritten in place, so only the
+                     latest one goes out; without one to overwrite the new frame is discarded
+    """
+    SEND_RETRIES = 3                # Attempts per frame when the socket is out of buffer space
+
+    def __init__(self, bus, high_water=256, policy="block"):
+        self.bus = bus
+        self.high_water = high_water
+        self.policy = policy
+        self.queue = collections.deque()        # [msg, enqueue time, coalesce key, origin] entries
+        self.pending = {}                       # Coalesce key -> its queued entry
+        self.cond = threading.Condition()
+        self.thread = None
+        self.closed = False
+        self.stats = {"sent": 0, "dropped": 0, "coalesced": 0, "errors": 0, "max_depth": 0}
+        self.latency = LatencyStats()           # Enqueue to bus.send returning
+        self.on_sent = None                     # Called as on_sent(msg, origin) after each frame is sent
+
+    def put(self, msg, policy=None, key=None, origin=None):
+        """Queue a frame, origin being the node that sent it. Returns False if it was dropped."""
+        policy = policy or self.policy
+        with self.cond:
+            if self.closed:
+                return False
+            if policy == "coalesce":
+                key = msg.arbitration_id if key is None else key
+                entry = self.pending.get(key)
+                if entry is not None:
+                    entry[0] = msg
+                    self.stats["coalesced"] += 1
+                    return True
+            if policy == "block":
+                while len(self.queue) >= self.high_water and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return False
+            elif len(self.queue) >= self.high_water:
+                self.stats["dropped"] += 1
+                return False
+
+            if policy != "coalesce":
+                key = None
+            entry = [msg, time.perf_counter(), key, origin]
+            self.queue.append(entry)
+            if key is not None:
+                self.pending[key] = entry
+            self.stats["max_depth"] = max(self.stats["max_depth"], len(self.queue))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+        return True
+
+    def close(self, timeout=0.5):
+        """Let the writer flush for up to timeout seconds, then stop it."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def depth(self):
+        return len(self.queue)
+
+    def metrics(self):
+        """Queue depth, counters and send latency."""
+        return dict(self.stats, depth=len(self.queue), latency=self.latency.summary())
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.queue and not self.closed:
+                    self.cond.wait()
+                if not self.queue:
+                    return
+                entry = self.queue.popleft()
+                if entry[2] is not None:
+                    del self.pending[entry[2]]
+                self.cond.notify_all()
+            self._send(entry)
+
+    def _send(self, entry):
+        msg, queued = entry[0], entry[1]
+        for attempt in range(self.SEND_RETRIES):
+            try:
+                self.bus.send(msg)
+                break
+            except (OSError, can.CanError) as e:
+                # ENOBUFS on a saturated bus clears once the kernel drains the socket
+                if attempt == self.SEND_RETRIES - 1 or self.closed:
+                    self.stats["errors"] += 1
+                    print(f"[TxQueue] Warning: Dropped frame {hex(msg.arbitration_id)} — {e}")
+                    return
+                time.sleep(0.001 * (attempt + 1))
+        self.stats["sent"] += 1
+        self.latency.record(time.perf_counter() - queued)
+        if self.on_sent is not None:
+            self.on_sent(msg, entry[3])
+
+class CyclicBroadcast:
+    """
+    A status frame repeated every period. On socketcan the kernel broadcast manager
+    transmits it and the node only touches it when the payload changes; on other
+    interfaces it is sent from the shared scheduler. For IDs that rotate, encode maps
+    the base ID to the ID on the wire and the task is re-targeted every hop seconds,
+    at the times boundary(now) returns when the ID schedule has its own clock.
+    """
+    def __init__(self, node, base_id, data, period, encode=None, hop=None, boundary=None):
+        self.node = node
+        self.base_id = base_id
+        self.data = list(data)
+        self.period = period
+        self.encode = encode or (lambda can_id: can_id)
+        self.hop = hop
+        self.boundary = boundary or (lambda now: now - now % hop + hop)
+        self.active = True              # False once cancelled
+        self.task = None                # Kernel cyclic task, None when sending from the scheduler
+        self.job = None
+        self.wire_id = None
+        self.replaced = collections.deque(maxlen=8)    # (time replaced, payload) of earlier payloads
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start transmitting, offloaded to the kernel where the bus allows it."""
+        # Restarting a kernel task sends at once, so only offload IDs that rotate no faster than the period
+        offload = type(self.node.bus).__name__ == "SocketcanBus" and (self.hop is None or self.hop >= self.period)
+        if offload:
+            try:
+                with self.lock:
+                    self._start_task()
+            except can.CanError:
+                offload = False
+        if not offload:
+            self.job = scheduler.every(self.period, self._send)
+        elif self.hop:
+            self._arm_retarget()
+        return self
+
+    def update(self, data):
+        """Change the payload sent from the next period on."""
+        with self.lock:
+            if list(data) != self.data:
+                self.replaced.append((time.time(), self.data))
+            self.data = list(data)
+            if self.task is not None:
+                self.task.modify_data(self._message(self.wire_id))
+
+    def is_echo(self, msg):
+        """
+        True if a received frame on this broadcast's ID may be one of its own transmissions
+        looped back, e.g. by the kernel: it carries the current payload, or one replaced
+        less than two periods ago that could still be in flight.
+        """
+        data = list(msg.data)
+        if data == self.data:
+            return True
+        now = time.time()
+        return any(old == data and now - replaced < 2 * self.period for replaced, old in self.replaced)
+
+    def cancel(self):
+        """Stop transmitting."""
+        self.active = False
+        with self.lock:
+            if self.job is not None:
+                self.job.cancel()
+            if self.task is not None:
+                self.task.stop()
+                self.task = None
+
+    def _message(self, can_id):
+        return can.Message(arbitration_id=can_id, data=self.data, is_extended_id=False)
+
+    def _send(self):
+        # Only the latest status matters, so a backlog of repeats collapses into one frame
+        self.node.send_message(self.encode(self.base_id), self.data, policy="coalesce", key=self.base_id)
+
+    def _start_task(self):
+        self.wire_id = self.encode(self.base_id)
+        self.task = self.node.bus.send_periodic(self._message(self.wire_id), self.period, store_task=False)
+
+    def _arm_retarget(self):
+        now = time.time()
+        self.job = scheduler.after(max(0.0, self.boundary(now) - now), self._retarget)
+
+    def _retarget(self):
+        """
+        Move the kernel task to the ID of the new hop slot. If the new task cannot be
+        started, the frame is sent from the scheduler instead, as when start() cannot offload.
+        """
+        try:
+            with self.lock:
+                if not self.active or self.task is None:
+                    return
+                if self.encode(self.base_id) != self.wire_id:
+                    self.task.stop()
+                    try:
+                        self._start_task()
+                    except (OSError, can.CanError) as e:
+                        print(f"[{self.node.node_id}] Warning: Cyclic task lost, sending from the scheduler — {e}")
+                        self.task = None
+                        self.job = scheduler.every(self.period, self._send)
+        finally:
+            # Keep following the hops whatever happened, unless the scheduler took over
+            if self.active and self.task is not None:
+                self._arm_retarget()
 
 class CANNode:
-    def __init__(self, node_id, bus_name='vcan0'):
+    def __init__(self, node_id, bus_name='vcan0', interface='socketcan', bus=None, period=1.0):
         self.node_id = node_id
-        self.bus = can.interface.Bus(bus_name, bustype='socketcan')
+        self.period = period            # Seconds between the node's periodic broadcasts
+        self.hosted = bus is not None   # An ECU host owns the bus and delivers frames to on_message
+        self.bus = bus if self.hosted else can.interface.Bus(bus_name, interface=interface)
         self.running = False
+        self.listen_ids = set()         # IDs let through the kernel filter, empty = receive everything
+        self.filter_period = None       # Re-install the filter every period (seconds) for rotating IDs
+        self.jobs = []                  # Scheduler jobs and cyclic broadcasts cancelled on stop
+        self.tx = TxQueue(self.bus)     # Outgoing frames; an ECUHost swaps in one queue shared by its ECUs
+        self.dispatch = {}              # Base ID -> payload prefix trie of handlers, see handle()
+        self.id_index = None            # Maps rotating IDs on the wire to base IDs (mtd.SlotIndex over dispatch)
+        self.batch_limit = 64           # Most frames drained from the socket per wake-up
+        self.rx_socket = None           # Raw socketcan socket when reading it directly
+        self.rx_stats = {"wakeups": 0, "frames": 0, "max_batch": 0, "overflows": 0}
+        self.batch_sizes = collections.Counter()
+
+    @classmethod
+    def from_args(cls, name, argv=None):
+        """
+        Create the node an ECU script runs as __main__, configured from its command line
+        (ignition passes these from topology.json):
+            --name NAME         node name (default: name)
+            --channel CHANNEL   CAN channel (default: vcan0)
+            --interface IFACE   python-can interface (default: socketcan)
+            --listen ID [ID..]  base IDs to receive, the rest of the handled IDs are dropped
+            --period SECONDS    interval of periodic broadcasts (default: 1.0)
+        """
+        parser = argparse.ArgumentParser(description=f"Run the {name}")
+        parser.add_argument("--name", default=name)
+        parser.add_argument("--channel", default="vcan0")
+        parser.add_argument("--interface", default="socketcan")
+        parser.add_argument("--listen", nargs="+", type=lambda value: int(value, 0))
+        parser.add_argument("--period", type=float, default=1.0)
+        args = parser.parse_args(argv)
+
+        node = cls(args.name, bus_name=args.channel, interface=args.interface, period=args.period)
+        if args.listen:
+            node.restrict(args.listen)
+        return node
 
     def start(self):
         """Start background thread to listen for CAN messages."""
         self.running = True
+        if self.hosted:
+            return
+        self.apply_filters()
+        self.rx_socket = self.overflow_socket()
         threading.Thread(target=self.receive_loop, daemon=True).start()
+        if self.filter_period:
+            threading.Thread(target=self.filter_loop, daemon=True).start()
+
+    def report_ready(self):
+        """
+        Report readiness to the launcher. Called once the node's start(), including what
+        subclasses start after super().start() such as their broadcasts, has returned.
+        """
+        if not self.hosted:
+            notify_ready()
 
     def stop(self):
         """Stop the receive loop and shut down the CAN bus."""
         self.running = False
+        for job in self.jobs:
+            job.cancel()
+        if self.hosted:
+            return
+        if self.tx is not None:
+            self.tx.close()
         try:
             self.bus.shutdown()
         except Exception as e:
             print(f"[{self.node_id}] Warning: Bus shutdown failed — {e}")
 
-    def send_message(self, target_id, data):
-        """Send a CAN message to the given arbitration ID."""
+    def every(self, period, callback):
+        """Run callback every period seconds on the shared scheduler until the node stops."""
+        return self._track(scheduler.every(period, callback))
+
+    def after(self, delay, callback):
+        """Run callback once after delay seconds on the shared scheduler, unless the node stops first."""
+        return self._track(scheduler.after(delay, callback))
+
+    def cyclic(self, base_id, data, period=None, encode=None, hop=None, boundary=None):
+        """Create a CyclicBroadcast owned by the node, stopped with it. Call start() on it to begin sending."""
+        return self._track(CyclicBroadcast(self, base_id, data, period or self.period, encode, hop, boundary))
+
+    def _track(self, job):
+        self.jobs = [j for j in self.jobs if j.active]
+        self.jobs.append(job)
+        return job
+
+    def send_message(self, target_id, data, policy=None, key=None):
+        """
+        Send a CAN message to the given arbitration ID through the node's TX queue.
+        policy and key choose how the frame is treated when the queue is full (see TxQueue).
+        """
         msg = can.Message(arbitration_id=target_id, data=data, is_extended_id=False)
-        self.bus.send(msg)
+        if self.tx is None:
+            self.bus.send(msg)
+        else:
+            self.tx.put(msg, policy, key, origin=self)
+
+    def handle(self, base_id, handler, prefix=()):
+        """
+        Register handler(msg) for frames on base_id whose payload starts with prefix.
+        Handlers live in a trie of dicts keyed by payload byte, with the handler under
+        None, so dispatch walks the frame's bytes once and the longest prefix wins.
+        """
+        node = self.dispatch.setdefault(base_id, {})
+        for byte in prefix:
+            node = node.setdefault(byte, {})
+        node[None] = handler
+        self.listen_ids.add(base_id)
+
+    def restrict(self, base_ids):
+        """Only receive the given base IDs, dropping the handlers registered for any others."""
+        keep = set(base_ids)
+        self.dispatch = {base_id: trie for base_id, trie in self.dispatch.items() if base_id in keep}
+        self.listen_ids &= keep
+        if self.id_index is not None:
+            self.id_index = type(self.id_index)(self.dispatch)
+
+    def filter_ids(self):
+        """IDs to accept in the kernel filter, the masked IDs of the adjacent slots when they rotate."""
+        if self.id_index is not None:
+            return self.id_index.masked_ids()
+        return self.listen_ids
+
+    def apply_filters(self):
+        """Install the node's IDs as socketcan filters so other frames never wake the node."""
+        ids = self.filter_ids()
+        if ids:
+            self.bus.set_filters([
+                {"can_id": can_id, "can_mask": 0x7FF, "extended": False} for can_id in sorted(ids)
+            ])
+
+    def next_boundary(self, now):
+        """Time of the next filter period boundary, on the ID index's slot clock when there is one."""
+        if self.id_index is not None:
+            return self.id_index.next_boundary(now)
+        return now - now % self.filter_period + self.filter_period
+
+    def filter_loop(self):
+        """Re-install the filter just after every period boundary."""
+        while self.running:
+            now = time.time()
+            time.sleep(max(0.0, self.next_boundary(now) - now))
+            try:
+                self.apply_filters()
+            except (OSError, can.CanError):
+                break
+
+    def overflow_socket(self):
+        """
+        Enable SO_RXQ_OVFL on a socketcan bus and return its socket, or None on other interfaces.
+        python-can's own recv rejects the extra control message, so such a socket is read
+        directly by receive_batch.
+        """
+        sock = getattr(self.bus, "socket", None)
+        if type(self.bus).__name__ != "SocketcanBus" or sock is None:
+            return None
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+        except OSError:
+            return None
+        return sock
+
+    def receive_batch(self, timeout):
+        """Wait up to timeout for a frame, then take the frames already queued behind it, up to batch_limit."""
+        if self.rx_socket is not None:
+            return self.drain_socket(timeout)
+
+        msg = self.bus.recv(timeout=timeout)
+        if msg is None:
+            return []
+        batch = [msg]
+        while len(batch) < self.batch_limit:
+            msg = self.bus.recv(timeout=0)
+            if msg is None:
+                break
+            batch.append(msg)
+        return batch
+
+    def drain_socket(self, timeout):
+        """Read queued frames straight from the socketcan socket, picking up the kernel drop count."""
+        ready, _, _ = select.select([self.rx_socket], [], [], timeout)
+        batch = []
+        while ready and len(batch) < self.batch_limit:
+            try:
+                frame, ancillary, _, _ = self.rx_socket.recvmsg(CANFD_MTU, RX_ANCILLARY_SIZE, socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                break
+
+            timestamp = 0.0
+            for level, kind, data in ancillary:
+                if kind == SO_TIMESTAMPNS:
+                    seconds, nanoseconds = struct.unpack_from("@ll", data)
+                    timestamp = seconds + nanoseconds * 1e-9
+                elif kind == SO_RXQ_OVFL:
+                    self.rx_stats["overflows"] = struct.unpack_from("=I", data)[0]
+
+            can_id, length = struct.unpack_from("=IB", frame)
+            batch.append(can.Message(
+                timestamp=timestamp,
+                arbitration_id=can_id & 0x1FFFFFFF,
+                is_extended_id=bool(can_id & 0x80000000),
+                is_remote_frame=bool(can_id & 0x40000000),
+                is_error_frame=bool(can_id & 0x20000000),
+                is_fd=len(frame) == CANFD_MTU,
+                data=frame[8:8 + length],
+                channel=self.bus.channel,
+            ))
+        return batch
 
     def receive_loop(self):
-        """Background message receiving loop."""
+        """Background receiving loop, one batch of frames per wake-up."""
         while self.running:
             try:
-                msg = self.bus.recv(timeout=1.0)
-                if msg:
-                    self.on_message(msg)
+                batch = self.receive_batch(timeout=1.0)
             except (OSError, can.CanError):
                 break
+            if not batch:
+                continue
+
+            stats = self.rx_stats
+            stats["wakeups"] += 1
+            stats["frames"] += len(batch)
+            stats["max_batch"] = max(stats["max_batch"], len(batch))
+            self.batch_sizes[len(batch)] += 1
+            self.on_batch(batch)
+
+    def receive_stats(self):
+        """Receive counters: wake-ups, frames, largest batch, kernel drops (SO_RXQ_OVFL) and batch size histogram."""
+        return dict(self.rx_stats, batch_sizes=dict(sorted(self.batch_sizes.items())))
+
+    def transmit_stats(self):
+        """TX queue depth, sent/dropped/coalesced/error counters and send latency, or None without a queue."""
+        return self.tx.metrics() if self.tx is not None else None
+
+    def on_batch(self, msgs):
+        """Handle the frames of one wake-up. Override to treat a burst as a whole."""
+        for msg in msgs:
+            self.on_message(msg)
 
     def on_message(self, msg):
-        """Override in subclasses to process incoming messages."""
-        pass
+        """Dispatch a frame to the handler registered for its ID and longest matching payload prefix."""
+        handler = self.route(msg)
+        if handler is not None:
+            handler(msg)
+
+    def route(self, msg):
+        """Return the handler for a frame's ID and longest matching payload prefix, or None."""
+        if self.id_index is None:
+            node = self.dispatch.get(msg.arbitration_id)
+        else:
+            route = self.id_index.lookup(msg.arbitration_id, msg.timestamp)
+            node = route[1] if route else None
+        if node is None:
+            return None
+
+        handler = node.get(None)
+        for byte in msg.data:
+            node = node.get(byte)
+            if node is None:
+                break
+            handler = node.get(None, handler)
+        return handler
+
+class AsyncCANNode(CANNode):
+    """
+    asyncio counterpart of CANNode. Frames arrive through a can.Notifier on the running
+    event loop and periodic work runs as tasks, so many nodes can share one loop
+    instead of each holding receive and broadcast threads.
+    """
+    def __init__(self, node_id, **kwargs):
+        super().__init__(node_id, **kwargs)
+        self.tx = None                  # Sends go straight to the bus rather than through a writer thread
+        self.reader = None
+        self.notifier = None
+        self.tasks = set()
+
+    async def start(self):
+        """Attach the node to the running event loop."""
+        self.running = True
+        if self.hosted:
+            return
+        self.apply_filters()
+        self.reader = can.AsyncBufferedReader()
+        self.notifier = can.Notifier(self.bus, [self.reader], loop=asyncio.get_running_loop())
+        self.spawn(self.receive_loop())
+        if self.filter_period:
+            self.spawn(self.filter_loop())
+
+    async def stop(self):
+        """Cancel the node's tasks and shut down the CAN bus."""
+        self.running = False
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.hosted:
+            return
+        if self.notifier is not None:
+            self.notifier.stop()
+        try:
+            self.bus.shutdown()
+        except Exception as e:
+            print(f"[{self.node_id}] Warning: Bus shutdown failed — {e}")
+
+    def spawn(self, coro):
+        """Run a coroutine as a task owned by the node, cancelled on stop."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def every(self, period, callback):
+        """
+        Await callback() every period seconds against absolute deadlines, so the
+        time spent in the callback does not push the following runs back.
+        Runs until stop() cancels it, so it may be set up before start().
+        """
+        async def run():
+            loop = asyncio.get_running_loop()
+            deadline = loop.time()
+            while True:
+                await callback()
+                deadline += period
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+        return self.spawn(run())
+
+    def after(self, delay, callback):
+        """Await callback() once after delay seconds."""
+        async def run():
+            await asyncio.sleep(delay)
+            await callback()
+        return self.spawn(run())
+
+    async def filter_loop(self):
+        """Re-install the filter just after every period boundary."""
+        while self.running:
+            now = time.time()
+            await asyncio.sleep(max(0.0, self.next_boundary(now) - now))
+            try:
+                self.apply_filters()
+            except (OSError, can.CanError):
+                break
+
+    async def receive_loop(self):
+        """Await frames from the notifier and hand them to on_message."""
+        while self.running:
+            msg = await self.reader.get_message()
+            await self.on_message(msg)
+
+    async def on_message(self, msg):
+        """Dispatch a frame through the same handler tries as CANNode, awaiting coroutine handlers."""
+        handler = self.route(msg)
+        if handler is not None:
+            result = handler(msg)
+            if inspect.isawaitable(result):
+                await result
@@ -3,12 +3,11 @@
 # If ON: Waits 3.0s, sends shutdown signal, then shutdown
 # CAN IDs dynamically encrypted
 
-import threading
 import signal
 import sys
 import time
 from can_node import CANNode
-from mtd import encrypt_id, decrypt_id 
+from mtd import encrypt_id, SlotIndex, HOP_PERIOD
 
 #CAN Payloads
 COMMAND_CONTROL = 0x07
@@ -20,21 +19,23 @@ class EngineECU(CANNode):
         super().__init__(node_id, **kwargs)
         self.broadcast_id = 0x703           # ID for readiness and status
         self.control_id = 0x001             # Ignition control command
+        self.handle(self.control_id, self.on_control, [COMMAND_CONTROL])
+        self.id_index = SlotIndex(self.dispatch)
+        self.filter_period = HOP_PERIOD
         self.running = True
         self.started = False
 
     def start(self):
         super().start()
 
-    def on_message(self, msg):
+    def on_control(self, msg):
         """
-        Toggle between startup and shutdown
+        Ignition command (0x001): start up or shut down after the readiness delay.
         """
-        if decrypt_id(msg.arbitration_id) == self.control_id and msg.data[0] == COMMAND_CONTROL:
-            if not self.started:
-                threading.Timer(3.0, self._handle_startup).start()
-            else:
-                threading.Timer(3.0, self._handle_shutdown).start()
+        if not self.started:
+            self.after(3.0, self._handle_startup)
+        else:
+            self.after(3.0, self._handle_shutdown)
 
     def _handle_startup(self):
         """
@@ -57,7 +58,7 @@ class EngineECU(CANNode):
         self.stop()
 
 if __name__ == "__main__":
-    ecu = EngineECU("MTD ENGINE ECU", bus_name="vcan0")
+    ecu = EngineECU.from_args("MTD ENGINE ECU")
 
     def handle_sigint(sig, frame):
         ecu.shutdown()
@@ -66,6 +67,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
@@ -3,12 +3,11 @@
 # Periodically broadcasts headlamp status (ID 0x301) using:
 # CAN IDs dynamically encrypted
 
-import threading
 import signal
 import sys
 import time
 from can_node import CANNode
-from mtd import encrypt_id, decrypt_id
+from mtd import encrypt_id, next_boundary, SlotIndex, HOP_PERIOD
 
 #CAN payloads
 TOGGLE_ON = [0x01, 0x55, 0xAA]
@@ -23,6 +22,11 @@ class HeadlampECU(CANNode):
         self.headlight_state = False       # Headlight initially OFF
         self.listen_id = 0x201              # Listen for headlamp toggle commands
         self.broadcast_id = 0x301           # Broadcast headlamp status
+        self.status_broadcast = self.cyclic(self.broadcast_id, STATUS_OFF, encode=encrypt_id, hop=HOP_PERIOD, boundary=next_boundary)
+        self.handle(self.listen_id, self.on_toggle_on, TOGGLE_ON)
+        self.handle(self.listen_id, self.on_toggle_off, TOGGLE_OFF)
+        self.id_index = SlotIndex(self.dispatch)
+        self.filter_period = HOP_PERIOD
         self.running = True                 
 
     def start(self):
@@ -32,45 +36,37 @@ class HeadlampECU(CANNode):
         super().start()
         self.start_status_broadcast()
 
-    def on_message(self, msg):
+    def on_toggle_on(self, msg):
         """
-        Process incoming CAN messages:
-        - Headlamp toggle commands
+        Headlamp toggle ON command (0x201).
         """
-        if decrypt_id(msg.arbitration_id) == self.listen_id:
-            # Handle toggle headlamp commands
-            cmd = msg.data[0]
+        if not self.headlight_state:
+            self.headlight_state = True
+            self.status_broadcast.update(STATUS_ON)
+            print(f"[MTD HEADLAMP ECU] Headlights turned ON")
 
-            if list(msg.data[0:3]) == TOGGLE_ON and not self.headlight_state:
-                self.headlight_state = True
-                print(f"[MTD HEADLAMP ECU] Headlights turned ON")
-
-            elif list(msg.data[0:3]) == TOGGLE_OFF and self.headlight_state:
-                self.headlight_state = False
-                print(f"[MTD HEADLAMP ECU] Headlights turned OFF")
+    def on_toggle_off(self, msg):
+        """
+        Headlamp toggle OFF command (0x201).
+        """
+        if self.headlight_state:
+            self.headlight_state = False
+            self.status_broadcast.update(STATUS_OFF)
+            print(f"[MTD HEADLAMP ECU] Headlights turned OFF")
 
     def start_status_broadcast(self):
         """
         Broadcast headlamp ON/OFF status
+        The payload is only updated on toggles, the ID follows the mask rotation.
         """
-        def loop():
-            if self.running:
-                if self.headlight_state:
-                    payload = STATUS_ON
-                else:
-                    payload = STATUS_OFF
-
-                self.send_message(encrypt_id(self.broadcast_id), payload)
-                threading.Timer(1.0, loop).start()
-
-        loop()
+        self.status_broadcast.start()
 
     def shutdown(self):
         self.running = False
         self.stop()
 
 if __name__ == "__main__":
-    ecu = HeadlampECU("MTD HEADLAMP ECU", bus_name="vcan0")
+    ecu = HeadlampECU.from_args("MTD HEADLAMP ECU")
 
     def handle_sigint(sig, frame):
         ecu.shutdown()
@@ -79,6 +75,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
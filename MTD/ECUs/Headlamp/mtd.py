@@ -3,35 +3,352 @@
 # AES-based masking for dynamic encryption of CAN IDs
 # Exempts control ID (0x001) from encryption/decryption
 
+import hashlib
+import hmac
+import mmap
+import os
+import struct
+import threading
 import time
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad
+from array import array
 
 # Symmetric AES 16 byte key
 AES_KEY = b'SecureECUSharedK'
 
 dynamic_mode = True 
 
+# Seconds per mask slot, configurable from 10 ms to 10 s
+HOP_PERIOD_ENV = "MTD_HOP_PERIOD"
+HOP_PERIOD = float(os.environ.get(HOP_PERIOD_ENV, "1.0"))
+if not 0.01 <= HOP_PERIOD <= 10.0:
+    raise ValueError(f"{HOP_PERIOD_ENV} must be between 0.01 and 10 seconds, got {HOP_PERIOD}")
+
+# The seed is the slot number within the hour (minutes * 60 + seconds at the default
+# 1 s period), so the mask schedule repeats every hour. The period has to divide the
+# hour, otherwise the last slot would be cut short and processes whose local UTC offsets
+# differ by an hour (either side of a DST change) would disagree on the slot.
+SLOTS = round(3600 / HOP_PERIOD)
+if abs(SLOTS * HOP_PERIOD - 3600) > 1e-6:
+    raise ValueError(f"{HOP_PERIOD_ENV} must divide 3600 seconds evenly, got {HOP_PERIOD}")
+
+# Optional cache file for the mask table, so several ECU processes can skip the AES work
+MASK_CACHE_ENV = "MTD_MASK_CACHE"
+
+# Masking mode: "xor" XORs the base ID with the slot mask, "perm" maps it through a
+# per-slot keyed permutation of the 11-bit ID space that never lands on a reserved ID
+MODE_ENV = "MTD_MODE"
+MODE = os.environ.get(MODE_ENV, "xor")
+if MODE not in ("xor", "perm"):
+    raise ValueError(f"{MODE_ENV} must be 'xor' or 'perm', got {MODE!r}")
+
+# The control ID and the base IDs the Static vehicle sends unmasked on the same bus.
+# In "perm" mode none of these is ever the masked form of another of them.
+RESERVED_IDS = frozenset({
+    0x001, 0x201, 0x301, 0x401, 0x402, 0x501, 0x601, 0x602, 0x603, 0x701, 0x702, 0x703, 0x704,
+})
+
+# Shared memory segment a provider (ignition) publishes the mask table in
+SHM_NAME_ENV = "MTD_SHM_NAME"
+SHM_NAME = os.environ.get(SHM_NAME_ENV, "mtd_mask_table")
+
+def _build_mask_table():
+    """
+    Derive the mask for every slot of the hourly cycle.
+
+    All seed blocks are encrypted in a single AES-ECB call, and the first
+    two bytes of each ciphertext block are masked to 11 bits. The mask of
+    a seed does not depend on the hop period, so a shorter period simply
+    extends the table (360000 slots at 10 ms).
+    """
+    # Only needed when no published table is available
+    from Crypto.Cipher import AES
+
+    seeds = b''.join(seed.to_bytes(16, byteorder='big') for seed in range(SLOTS))
+    encrypted = AES.new(AES_KEY, AES.MODE_ECB).encrypt(seeds)
+
+    # Each 16-byte block starts with the big endian 16-bit value we need
+    return array('H', (value & 0x7FF for (value,) in struct.iter_unpack('>H14x', encrypted)))
+
+# Length of the HMAC tag in front of a cached or published mask table
+TAG_SIZE = hashlib.sha256().digest_size
+
+def _table_tag(data):
+    """
+    HMAC-SHA256 of a serialised mask table, keyed by AES_KEY.
+    The slot count is authenticated too, so a table for another hop period is rejected.
+    """
+    return hmac.new(AES_KEY, b'mtd-mask-table' + SLOTS.to_bytes(4, 'big') + bytes(data), hashlib.sha256).digest()
+
+def _private(fd):
+    """
+    True if an open file belongs to this user and nobody else can write to it.
+    """
+    info = os.fstat(fd)
+    return info.st_uid == os.getuid() and not info.st_mode & 0o022
+
+def load_mask_table(path=None):
+    """
+    Return the full-cycle mask table as an array('H') indexed by slot.
+
+    If a cache path is given, the table is read from it when present and
+    valid, otherwise it is computed and written there for the next process.
+    The cache must be owned by this user and not writable by others, and
+    starts with an HMAC of the table keyed by AES_KEY. Anything else (a
+    stale file from another key or hop period, or a planted one) is
+    rebuilt rather than trusted.
+    """
+    if path:
+        try:
+            with open(path, 'rb') as f:
+                if _private(f.fileno()):
+                    tag, data = f.read(TAG_SIZE), f.read(SLOTS * 2 + 1)
+                    if len(data) == SLOTS * 2 and hmac.compare_digest(tag, _table_tag(data)):
+                        return array('H', data)
+        except OSError:
+            pass
+
+    table = _build_mask_table()
+
+    if path:
+        # Write a private file then rename, so a process starting in parallel never
+        # reads a partial file and nobody else can swap its contents
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with open(fd, 'wb') as f:
+                f.write(_table_tag(table.tobytes()))
+                table.tofile(f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    return table
+
+def publish_mask_table(name=SHM_NAME):
+    """
+    Compute the mask table once and publish it in a shared memory segment.
+
+    ECU processes importing this module afterwards map the segment instead
+    of deriving the masks (and importing Crypto) themselves. The segment
+    holds the same HMAC tag and table as the cache file. The caller owns
+    the returned SharedMemory and should close() and unlink() it on shutdown.
+    """
+    from multiprocessing import shared_memory
+
+    table = load_mask_table(os.environ.get(MASK_CACHE_ENV)).tobytes()
+    size = TAG_SIZE + len(table)
+
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        # Left behind by a run that did not shut down cleanly. It may have been
+        # created for another hop period or by someone else, so start afresh.
+        stale = shared_memory.SharedMemory(name=name)
+        stale.close()
+        stale.unlink()
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+    shm.buf[:size] = _table_tag(table) + table
+    return shm
+
+def _attach_mask_table(name=SHM_NAME):
+    """
+    Map a published mask table read-only, or return None if there is none.
+
+    The segment is mapped directly rather than through SharedMemory, so
+    exiting ECUs never unlink it or trip the resource tracker. As with the
+    cache file, it is only used when it belongs to this user, is not writable
+    by others and carries a valid HMAC tag.
+    """
+    try:
+        fd = os.open(f"/dev/shm/{name}", os.O_RDONLY)
+    except OSError:
+        return None
+
+    try:
+        if not _private(fd):
+            return None
+        mapping = mmap.mmap(fd, TAG_SIZE + SLOTS * 2, prot=mmap.PROT_READ)
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
+
+    table = memoryview(mapping)[TAG_SIZE:]
+    if not hmac.compare_digest(mapping[:TAG_SIZE], _table_tag(table)):
+        return None
+    return table.cast('H')
+
+MASK_TABLE = _attach_mask_table()
+if MASK_TABLE is None:
+    MASK_TABLE = load_mask_table(os.environ.get(MASK_CACHE_ENV))
+
+# Local UTC offset, so slots can be derived from epoch timestamps without time.localtime()
+# (whole-hour DST shifts do not move minutes and seconds, so this stays valid all year)
+_UTC_OFFSET = time.localtime().tm_gmtoff
+
+# Frames decoded with the previous slot's mask because they crossed a slot boundary
+recovered_frames = 0
+
+def epoch_at(timestamp):
+    """
+    Return the hop epoch counter for an epoch timestamp.
+    It increases by one every HOP_PERIOD and never goes back within a run.
+    """
+    return int((timestamp + _UTC_OFFSET) // HOP_PERIOD)
+
+def next_boundary(timestamp=None):
+    """
+    Return the epoch timestamp at which the slot after the one at timestamp (default now) begins.
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    return (epoch_at(timestamp) + 1) * HOP_PERIOD - _UTC_OFFSET
+
+def slot_at(timestamp):
+    """
+    Return the mask slot (local minutes * 60 + seconds at 1 s hops) for an epoch timestamp.
+    """
+    return epoch_at(timestamp) % SLOTS
+
+_cached = (None, 0)  # (hop epoch, mask), swapped as one tuple so threads never see a torn pair
+
 def _generate_mask():
     """
-    Generate a pseudo-random mask using AES encryption of a time-based seed.
+    Look up the pseudo-random mask for the current time slot.
     
     Steps:
-    - Take current minutes and seconds into a 16-byte block.
-    - Encrypt using AES-ECB with the shared AES key.
-    - Use the first two bytes, masked to 11 bits (0x7FF).
+    - Take the current hop epoch, modulo the hourly cycle, as the slot (seed) number.
+    - Read the AES-derived 11-bit mask for that slot from MASK_TABLE.
+
+    The mask only changes once per hop, so it is cached against the
+    current epoch and only looked up again when the slot rolls over.
     """
-    # Converts current time into seconds and turns that into 16 bytes (big endian)
-    now = time.localtime()
-    seed = (now.tm_min * 60 + now.tm_sec).to_bytes(16, byteorder='big') 
+    global _cached
 
-    cipher = AES.new(AES_KEY, AES.MODE_ECB)
-    encrypted = cipher.encrypt(seed)
-    
-    # Takes the first 2 bytes from encrypted and turns them into an integer then masks to 11 bits
-    mask = int.from_bytes(encrypted[:2], byteorder='big') & 0x7FF  # 11-bit mask
+    epoch = epoch_at(time.time())
+    cached_epoch, cached_mask = _cached
+    if epoch == cached_epoch:
+        return cached_mask
+
+    mask = MASK_TABLE[epoch % SLOTS]
+
+    _cached = (epoch, mask)
     return mask
 
+# Ring of (slot, (forward, inverse)) around the current slot, indexed by slot % 4 and filled
+# ahead of time by a preparer thread. Entries are replaced as whole tuples so concurrent
+# readers never see a torn pair.
+_permutations = [(None, None)] * 4
+_preparer_pid = None    # Process the preparer thread runs in; a forked child starts its own
+_preparer_lock = threading.Lock()
+
+def _build_permutation(slot):
+    """
+    Derive the keyed permutation of the 11-bit ID space for a slot.
+
+    An AES-CTR keystream (nonce = slot) gives every ID a 32-bit sort key,
+    and the IDs in key order become the images of the IDs in natural
+    order. 0x001 is a fixed point. Any reserved ID whose image is itself
+    reserved swaps images with the next unreserved ID in key order, so
+    the result stays a bijection while no reserved base ID is ever sent
+    as another reserved ID.
+    """
+    from Crypto.Cipher import AES
+
+    nonce = b'perm' + slot.to_bytes(4, byteorder='big')
+    keystream = AES.new(AES_KEY, AES.MODE_CTR, nonce=nonce).encrypt(bytes(4 * 2048))
+    keys = struct.unpack('>2048I', keystream)
+
+    movable = [can_id for can_id in range(2048) if can_id != 0x001]
+    shuffled = sorted(movable, key=keys.__getitem__)
+
+    forward = array('H', range(2048))
+    for can_id, image in zip(movable, shuffled):
+        forward[can_id] = image
+
+    spares = (can_id for can_id in shuffled if can_id not in RESERVED_IDS and forward[can_id] not in RESERVED_IDS)
+    for base_id in sorted(RESERVED_IDS - {0x001}):
+        if forward[base_id] in RESERVED_IDS:
+            spare = next(spares)
+            forward[base_id], forward[spare] = forward[spare], forward[base_id]
+
+    inverse = array('H', bytes(2 * 2048))
+    for can_id, image in enumerate(forward):
+        inverse[image] = can_id
+
+    return forward, inverse
+
+def prepare_slots(timestamp=None):
+    """
+    Build the permutations of the previous, current and next slot at timestamp
+    (default now) that are not in the ring yet. Does nothing in "xor" mode.
+    """
+    if MODE != "perm":
+        return
+    epoch = epoch_at(time.time() if timestamp is None else timestamp)
+    for slot in (epoch - 1, epoch, epoch + 1):
+        slot %= SLOTS
+        if _permutations[slot % 4][0] != slot:
+            _permutations[slot % 4] = (slot, _build_permutation(slot))
+
+def _prepare_loop():
+    """
+    Keep the ring one slot ahead: wake halfway through every slot and build the next one,
+    so the AES and sorting work never lands on the send or receive path.
+    """
+    while True:
+        now = time.time()
+        prepare_slots(now)
+        time.sleep(max(0.0, next_boundary(now) + HOP_PERIOD / 2 - time.time()))
+
+def start_preparer():
+    """
+    Start the preparer thread of this process in "perm" mode, once.
+    Called lazily rather than at import, so a launcher can import this module and still fork.
+    """
+    global _preparer_pid
+
+    if MODE != "perm" or _preparer_pid == os.getpid():
+        return
+    with _preparer_lock:
+        if _preparer_pid != os.getpid():
+            _preparer_pid = os.getpid()
+            threading.Thread(target=_prepare_loop, name="mtd-prepare", daemon=True).start()
+
+def _permutation(slot):
+    """
+    Return the (forward, inverse) permutation tables for a slot from the ring.
+    The preparer has normally built them a slot early; only a cold start or a
+    slot far from now (offline analysis) builds them here.
+    """
+    cached_slot, tables = _permutations[slot % 4]
+    if cached_slot != slot:
+        start_preparer()
+        tables = _build_permutation(slot)
+        _permutations[slot % 4] = (slot, tables)
+    return tables
+
+def _encode(base_id, slot):
+    """
+    Mask a base ID for a given slot in the configured mode.
+    """
+    if base_id == 0x001:
+        return base_id
+    if MODE == "perm":
+        return _permutation(slot)[0][base_id]
+    return base_id ^ MASK_TABLE[slot]
+
+def _decode(received_id, slot):
+    """
+    Unmask a received ID for a given slot in the configured mode.
+    """
+    if received_id == 0x001:
+        return received_id
+    if MODE == "perm":
+        return _permutation(slot)[1][received_id]
+    return received_id ^ MASK_TABLE[slot]
+
 def encrypt_id(base_id):
     """
     Encrypt a static CAN ID using the generated AES mask.
@@ -39,17 +356,201 @@ def encrypt_id(base_id):
     """
     if base_id == 0x001:
         return base_id  # Never encrypt control commands
+
+    if MODE == "perm":
+        return _permutation(slot_at(time.time()))[0][base_id]
     
     mask = _generate_mask()
     return base_id ^ mask  # XOR masking
 
-def decrypt_id(received_id):
+def decrypt_id(received_id, timestamp=None, accept=None):
     """
     Decrypt a received CAN ID using the same AES mask.
     Control messages (ID 0x001) are exempt and processed directly.
+
+    If the frame's receive timestamp (msg.timestamp) is given, the slot is
+    taken from it rather than from the clock at processing time. If the IDs
+    the caller listens for are also given, a frame that does not decode into
+    them is retried with the previous slot's mask, which recovers frames
+    encrypted just before a slot boundary.
     """
+    global recovered_frames
+
     if received_id == 0x001:
         return received_id  # Never decrypt control commands
 
-    mask = _generate_mask()
-    return received_id ^ mask  # XOR unmasking
+    if not timestamp:
+        if MODE == "perm":
+            return _permutation(slot_at(time.time()))[1][received_id]
+        mask = _generate_mask()
+        return received_id ^ mask  # XOR unmasking
+
+    slot = slot_at(timestamp)
+    base_id = _decode(received_id, slot)
+    if accept is None or base_id in accept:
+        return base_id
+
+    previous_id = _decode(received_id, (slot - 1) % SLOTS)
+    if previous_id in accept:
+        recovered_frames += 1
+        return previous_id
+
+    return base_id
+
+def _slot_masks(timestamps):
+    """
+    Return the mask for each epoch timestamp as a NumPy uint16 array.
+    """
+    import numpy as np
+
+    table = np.frombuffer(MASK_TABLE, dtype=np.uint16)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    epochs = ((timestamps + _UTC_OFFSET) // HOP_PERIOD).astype(np.int64)
+    return table[epochs % SLOTS]
+
+def _permutation_array(slot):
+    """
+    _build_permutation for offline analysis: the same tables as NumPy uint16 arrays,
+    with the sort done by NumPy so hour-long captures with thousands of slots stay fast.
+    """
+    import numpy as np
+    from Crypto.Cipher import AES
+
+    nonce = b'perm' + slot.to_bytes(4, byteorder='big')
+    keystream = AES.new(AES_KEY, AES.MODE_CTR, nonce=nonce).encrypt(bytes(4 * 2048))
+    keys = np.frombuffer(keystream, dtype='>u4')
+
+    movable = np.delete(np.arange(2048, dtype=np.uint16), 0x001)
+    shuffled = movable[np.argsort(keys[movable], kind='stable')]
+
+    forward = np.arange(2048, dtype=np.uint16)
+    forward[movable] = shuffled
+
+    # Same swaps as _build_permutation, spares taken lazily in key order
+    position = 0
+    for base_id in sorted(RESERVED_IDS - {0x001}):
+        if forward[base_id] in RESERVED_IDS:
+            while shuffled[position] in RESERVED_IDS or forward[shuffled[position]] in RESERVED_IDS:
+                position += 1
+            spare = shuffled[position]
+            position += 1
+            forward[base_id], forward[spare] = forward[spare], forward[base_id]
+
+    inverse = np.empty(2048, dtype=np.uint16)
+    inverse[forward] = np.arange(2048, dtype=np.uint16)
+    return forward, inverse
+
+def _apply_per_slot(ids, timestamps, table_index):
+    """
+    Map IDs through each frame's permutation table (0 = forward, 1 = inverse).
+    The tables of the slots in the capture are stacked into one (slots, 2048) array,
+    so every frame is mapped in a single indexing step, however many slots there are.
+    """
+    import numpy as np
+
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    slots = ((timestamps + _UTC_OFFSET) // HOP_PERIOD).astype(np.int64) % SLOTS
+    unique, inverse = np.unique(slots, return_inverse=True)
+    stacked = np.empty((len(unique), 2048), dtype=np.uint16)
+    for row, slot in enumerate(unique.tolist()):
+        # Capture slots are mostly far from now, so build them without disturbing the live ring
+        stacked[row] = _permutation_array(slot)[table_index]
+    return stacked[inverse.reshape(ids.shape), ids]
+
+def encrypt_ids(ids, timestamps):
+    """
+    Vectorised encrypt_id for offline analysis.
+    Masks an array of base IDs, each with the slot of its own timestamp.
+    Control messages (ID 0x001) are left unencrypted.
+    """
+    import numpy as np
+
+    ids = np.asarray(ids, dtype=np.uint16)
+    if MODE == "perm":
+        return _apply_per_slot(ids, timestamps, 0)
+    return np.where(ids == 0x001, ids, ids ^ _slot_masks(timestamps))
+
+def decrypt_ids(ids, timestamps):
+    """
+    Vectorised decrypt_id for offline analysis.
+    Unmasks an array of received IDs (e.g. a recorded capture) in one call.
+    Control messages (ID 0x001) are left as they are.
+    """
+    import numpy as np
+
+    ids = np.asarray(ids, dtype=np.uint16)
+    if MODE == "perm":
+        return _apply_per_slot(ids, timestamps, 1)
+    return np.where(ids == 0x001, ids, ids ^ _slot_masks(timestamps))
+
+class SlotIndex:
+    """
+    Reverse index from masked CAN ID to (base ID, route) for the IDs a node listens to,
+    where the route is whatever the node dispatches on (a handler or a handler trie).
+
+    Holds the masked IDs of the current slot and the one before it, so a
+    received frame is routed (or rejected) with one dict lookup and no XOR
+    or AES work. When the slot rolls over by one, the current index becomes
+    the previous one and only the new slot is computed.
+    """
+    def __init__(self, routes):
+        self.routes = dict(routes)          # base ID -> route
+        self._state = (None, {}, {})        # (slot, current index, previous index)
+        start_preparer()
+
+    def _build(self, slot):
+        # A base ID that masks to 0x001 in this slot must not shadow the control ID,
+        # which decrypt_id always treats as control
+        return {
+            masked: (base_id, route)
+            for base_id, route in self.routes.items()
+            for masked in (_encode(base_id, slot),)
+            if masked != 0x001 or base_id == 0x001
+        }
+
+    def _roll(self, slot):
+        last_slot, current, _ = self._state
+        if last_slot is not None and (last_slot + 1) % SLOTS == slot:
+            previous = current
+        else:
+            previous = self._build((slot - 1) % SLOTS)
+        state = (slot, self._build(slot), previous)
+        self._state = state
+        return state
+
+    def lookup(self, received_id, timestamp=None):
+        """
+        Return (base ID, route) for a received ID, or None if the node does not listen to it.
+        The slot is taken from the frame timestamp when given, as in decrypt_id.
+        """
+        global recovered_frames
+
+        slot = slot_at(timestamp or time.time())
+        state = self._state
+        if state[0] != slot:
+            state = self._roll(slot)
+
+        route = state[1].get(received_id)
+        if route is None:
+            route = state[2].get(received_id)
+            if route is not None:
+                recovered_frames += 1
+        return route
+
+    def next_boundary(self, timestamp=None):
+        """
+        Return the epoch timestamp at which the masked IDs next change.
+        """
+        return next_boundary(timestamp)
+
+    def masked_ids(self):
+        """
+        Return the masked IDs of the previous, current and next slot.
+        Installed as a kernel filter, this set stays valid for the whole current slot.
+        """
+        slot = slot_at(time.time())
+        state = self._state
+        if state[0] != slot:
+            state = self._roll(slot)
+
+        return set(state[1]) | set(state[2]) | set(self._build((slot + 1) % SLOTS))
@@ -6,7 +6,7 @@ import signal
 import sys
 import time
 from can_node import CANNode
-from mtd import encrypt_id, decrypt_id
+from mtd import encrypt_id, SlotIndex, HOP_PERIOD
 
 #CAN Payloads
 CONTROL_COMMAND_LEFT = 0x04
@@ -27,28 +27,16 @@ class IndicatorSwitchECU(CANNode):
         self.hazards_on = False
         self.control_id = 0x001               # Listen for ignition commands
         self.broadcast_id = 0x601             # Send instructions to indicators
+        self.handle(self.control_id, lambda msg: self.toggle_left(), [CONTROL_COMMAND_LEFT])
+        self.handle(self.control_id, lambda msg: self.toggle_right(), [CONTROL_COMMAND_RIGHT])
+        self.handle(self.control_id, lambda msg: self.toggle_hazard(), [CONTROL_COMMAND_HAZARD])
+        self.id_index = SlotIndex(self.dispatch)
+        self.filter_period = HOP_PERIOD
         self.running = True                   
 
     def start(self):
         super().start()
 
-    def on_message(self, msg):
-        """
-        Process incoming CAN messages:
-        - Listen for user control commands (ID 0x001)
-        """
-        if decrypt_id(msg.arbitration_id) == self.control_id:
-            command = msg.data[0]
-
-            if command == 0x04:
-                self.toggle_left()
-
-            elif command == 0x05:
-                self.toggle_right()
-
-            elif command == 0x06:
-                self.toggle_hazard()
-
     def toggle_left(self):
         """
         Toggle left indicator ON/OFF.
@@ -90,7 +78,7 @@ class IndicatorSwitchECU(CANNode):
         self.stop()
 
 if __name__ == "__main__":
-    ecu = IndicatorSwitchECU("MTD INDICATOR SWITCH ECU", bus_name="vcan0")
+    ecu = IndicatorSwitchECU.from_args("MTD INDICATOR SWITCH ECU")
 
     def handle_sigint(sig, frame):
 
@@ -100,6 +88,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
@@ -3,12 +3,12 @@
 # Broadcasts current status (ID 0x602)
 # CAN IDs dynamically encrypted
 
-import threading
 import signal
 import sys
 import time
+from functools import partial
 from can_node import CANNode
-from mtd import encrypt_id, decrypt_id
+from mtd import encrypt_id, next_boundary, SlotIndex, HOP_PERIOD
 
 LEFT_ON = [0x10, 0x00, 0xC1]
 LEFT_OFF = [0x10, 0x00, 0xC0]
@@ -24,56 +24,41 @@ class LeftIndicatorECU(CANNode):
         self.hazard_mode = False             
         self.listen_id = 0x601               # Receive commands on this ID
         self.broadcast_id = 0x602            # Broadcast status on this ID
+        self.status_broadcast = self.cyclic(self.broadcast_id, STATUS_OFF + [0]*2, encode=encrypt_id, hop=HOP_PERIOD, boundary=next_boundary)
+        self.handle(self.listen_id, partial(self.on_command, True, False, "Left Indicator ON"), LEFT_ON)
+        self.handle(self.listen_id, partial(self.on_command, False, False, "Left Indicator OFF"), LEFT_OFF)
+        self.handle(self.listen_id, partial(self.on_command, True, True, "Hazard Lights (Left) ON"), HAZARD_ON)
+        self.handle(self.listen_id, partial(self.on_command, False, False, "Hazard Lights (Left) OFF"), HAZARD_OFF)
+        self.id_index = SlotIndex(self.dispatch)
+        self.filter_period = HOP_PERIOD
         self.running = True                  
 
     def start(self):
         super().start()
         self.start_status_broadcast()
 
-    def on_message(self, msg):
+    def on_command(self, active, hazard_mode, label, msg):
         """
-        Process incoming encrypted CAN messages:
-        - Listen for indicator or hazard control commands (ID 0x601)
+        Indicator or hazard control command (0x601), bound to its payload in __init__.
         """
-        if decrypt_id(msg.arbitration_id) == self.listen_id:
-            if list(msg.data[0:3]) == LEFT_ON:
-                self.active = True
-                self.hazard_mode = False
-                print(f"[MTD LEFT INDICATOR ECU] Left Indicator ON")
-
-            elif list(msg.data[0:3]) == LEFT_OFF:
-                self.active = False
-                self.hazard_mode = False
-                print(f"[MTD LEFT INDICATOR ECU] Left Indicator OFF")
-
-            elif list(msg.data[0:3]) == HAZARD_ON:
-                self.active = True
-                self.hazard_mode = True
-                print(f"[MTD LEFT INDICATOR ECU] Hazard Lights (Left) ON")
-
-            elif list(msg.data[0:3]) == HAZARD_OFF:
-                self.active = False
-                self.hazard_mode = False
-                print(f"[MTD LEFT INDICATOR ECU] Hazard Lights (Left) OFF")
+        self.active = active
+        self.hazard_mode = hazard_mode
+        print(f"[MTD LEFT INDICATOR ECU] {label}")
+        self.status_broadcast.update((STATUS_ON if self.active else STATUS_OFF) + [0]*2)
 
     def start_status_broadcast(self):
         """
         Broadcast indicator status every 1 second.
+        The payload is only updated on commands, the ID follows the mask rotation.
         """
-        def loop():
-            if self.running:
-                status = STATUS_ON if self.active else STATUS_OFF
-                self.send_message(encrypt_id(self.broadcast_id), status + [0]*2)
-                threading.Timer(1.0, loop).start()
-
-        loop()
+        self.status_broadcast.start()
 
     def shutdown(self):
         self.running = False
         self.stop()
 
 if __name__ == "__main__":
-    ecu = LeftIndicatorECU("MTD LEFT INDICATOR ECU", bus_name="vcan0")
+    ecu = LeftIndicatorECU.from_args("MTD LEFT INDICATOR ECU")
 
     def handle_sigint(sig, frame):
 
@@ -83,6 +68,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
@@ -3,7 +3,7 @@
 #     - Battery ECU expected at 1.0s
 #     - Fuel ECU expected at 2.0s
 #     - Engine ECU expected at 3.0s
-# Verifies timing and correct order
+# Verifies timing and correct order, using the kernel receive timestamps of the frames
 # On valid sequence: broadcasts startup
 # On invalid timing or order: broadcasts failure
 # CAN IDs dynamically encrypted
@@ -11,8 +11,9 @@
 import time
 import signal
 import sys
-from can_node import CANNode
-from mtd import encrypt_id, decrypt_id 
+from functools import partial
+from can_node import CANNode, LatencyStats
+from mtd import encrypt_id, SlotIndex, HOP_PERIOD
 
 # CAN Payloads
 COMMAND_CONTROL = 0x07
@@ -30,7 +31,13 @@ class StarterMotorECU(CANNode):
         self.fuel_id = 0x702
         self.engine_id = 0x703
         self.broadcast_id = 0x704
+        self.handle(self.control_id, self.on_control, [COMMAND_CONTROL])
+        for base_id in (self.battery_id, self.fuel_id, self.engine_id):
+            self.handle(base_id, partial(self.on_readiness, base_id))
+        self.id_index = SlotIndex(self.dispatch)
+        self.filter_period = HOP_PERIOD
         self.running = True
+        self.handler_latency = LatencyStats()    # Kernel receive time to handler time
         self.reset_state()
 
     def start(self):
@@ -47,17 +54,30 @@ class StarterMotorECU(CANNode):
             self.engine_id: None
         }
 
-    def on_message(self, msg):
-        now = time.perf_counter()
+    def arrival(self, msg):
+        """
+        Time the frame reached the socket (SO_TIMESTAMP), so backlog in this process
+        does not shift the sequence windows. Records how long it waited for its handler.
+        """
+        now = time.time()
+        if not msg.timestamp:
+            return now
+        self.handler_latency.record(now - msg.timestamp)
+        return msg.timestamp
 
-        if decrypt_id(msg.arbitration_id) == self.control_id and msg.data[0] == COMMAND_CONTROL:
-            self.reset_state()
-            self.start_time = now
+    def metrics(self):
+        return {"handler_latency": self.handler_latency.summary()}
 
+    def on_control(self, msg):
+        self.reset_state()
+        self.start_time = self.arrival(msg)
+
+    def on_readiness(self, base_id, msg):
+        now = self.arrival(msg)
         # If the timer has started and we receive a message from one of the expected ECUs
-        elif self.start_time and decrypt_id(msg.arbitration_id) in self.received:
-            if self.received[decrypt_id(msg.arbitration_id)] is None:
-                self.received[decrypt_id(msg.arbitration_id)] = (now - self.start_time, list(msg.data[:4])) # record how long it took to arrive
+        if self.start_time:
+            if self.received[base_id] is None:
+                self.received[base_id] = (now - self.start_time, list(msg.data[:4])) # record how long it took to arrive
 
             # Check timing
             if all(self.received.values()):
@@ -73,25 +93,33 @@ class StarterMotorECU(CANNode):
             r[self.battery_id][0] < r[self.fuel_id][0] < r[self.engine_id][0]
         )
 
-        time.sleep(1.0)
+        # The result goes out a second later from the scheduler, the receive thread never waits
+        self.reset_state()
+        self.after(1.0, partial(self.announce, valid))
 
+    def announce(self, valid):
+        """
+        Broadcast the outcome of a completed sequence (0x704).
+        """
         if valid:
             print(f"[STARTER MOTOR ECU] Valid startup sequence — engine starting")
             payload = STARTUP
         else:
             print(f"[STARTER MOTOR ECU] Invalid startup sequence")
             payload = FAILURE
-            
-        self.send_message(encrypt_id(self.broadcast_id), payload)
-        self.reset_state()
 
+        self.send_message(encrypt_id(self.broadcast_id), payload)
 
     def shutdown(self):
         self.running = False
         self.stop()
+        latency = self.handler_latency.summary()
+        if latency["count"]:
+            print(f"[STARTER MOTOR ECU] Handler latency over {latency['count']} frames — "
+                  f"mean {latency['mean_us']:.0f} us, p99 {latency['p99_us']:.0f} us, max {latency['max_us']:.0f} us")
 
 if __name__ == "__main__":
-    ecu = StarterMotorECU("STARTER MOTOR ECU", bus_name="vcan0")
+    ecu = StarterMotorECU.from_args("STARTER MOTOR ECU")
 
     def handle_sigint(sig, frame):
 
@@ -101,6 +129,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
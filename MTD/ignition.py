@@ -1,49 +1,81 @@
 # Central controller for launching and managing ECUs
 
-import subprocess
-import time
-import signal
+import os
+import tempfile
+import sys
 import readchar
 import can
 
-ecu_processes = []
+# MTD ECUs share one cached mask table instead of each deriving it at import.
+# Set before importing mtd, which loads the table at import.
+os.environ.setdefault("MTD_MASK_CACHE", os.path.join(tempfile.gettempdir(), f"mtd_masks.{os.getuid()}.bin"))
+
+# The provider side of the MTD module and the launcher helpers live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import mtd
+import ecu_launcher
+import topology
+
+launches = []
 running = True
 bus = None  
+mask_shm = None
+
+def publish_masks():
+    """
+    Publish the MTD mask table in shared memory before any ECU imports mtd.
+    """
+    global mask_shm
+    try:
+        mask_shm = mtd.publish_mask_table()
+    except OSError as e:
+        print(f"[Ignition] Shared mask table unavailable, ECUs derive their own — {e}")
+
+def release_masks():
+    """
+    Remove the shared mask table segment.
+    """
+    global mask_shm
+    if mask_shm is not None:
+        mask_shm.close()
+        mask_shm.unlink()
+        mask_shm = None
 
-def launch_ecus():
+def launch(ecu):
     """
-    Launch ECU subprocesses.
+    Start one ECU process of the topology that reports when it is ready.
     """
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/HeadlampSwitch/headlamp_switch_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/Headlamp/headlamp_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/ForceSensor/force_sensor_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/CrashDetector/crash_detector_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/Airbag/airbag_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/IndicatorSwitch/indicator_switch_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/LeftIndicator/left_indicator_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/RightIndicator/right_indicator_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/Battery/battery_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/FuelSystem/fuel_system_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/EngineControl/engine_control_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/StarterMotor/starter_motor_ecu.py"]))
+    launches.append(ecu_launcher.spawn(ecu.name, ecu.args(), cwd=topology.ROOT))
+
+def wait_for_ecus(timeout=10.0):
+    """
+    Wait until every launched ECU is listening, then report the boot times.
+    """
+    ecu_launcher.wait_ready(launches, timeout)
+    ecu_launcher.report_boot(launches)
+
+def launch_ecus(vehicle):
+    """
+    Launch the MTD ECUs of the topology as subprocesses.
+    """
+    for ecu in vehicle.ecus:
+        launch(ecu)
 
 def terminate_ecus():
-    for proc in ecu_processes:
-        try:
-            proc.send_signal(signal.SIGINT)
-            proc.wait(timeout=2)
-        except subprocess.TimeoutExpired:
-            proc.kill()
+    """
+    Stop all ECUs in parallel, killing any that are still running after the shutdown deadline.
+    """
+    ecu_launcher.terminate(launches)
     print("[Ignition] All ECUs terminated.")
 
-def input_loop():
+def input_loop(channel="vcan0", interface="socketcan"):
     """
     Handles user input and sends CAN messages accordingly.
     """
     global running
     global bus
 
-    bus = can.interface.Bus(channel="vcan0", interface="socketcan")
+    bus = can.interface.Bus(channel=channel, interface=interface)
     print("\nEnter Input — [1] Toggle Headlights, [2] Trigger Crash, [3] Start Engine, [←] Left Indicator, [→] Right Indicator, [↑] Hazard, [q] Quit:")
 
     while running:
@@ -101,9 +133,12 @@ def shutdown_bus():
 
 if __name__ == "__main__":
     try:
-        launch_ecus()
-        time.sleep(1.0)  # Let ECUs boot
-        input_loop()
+        publish_masks()
+        vehicle = topology.load().select(variants=["MTD"])
+        launch_ecus(vehicle)
+        wait_for_ecus()
+        input_loop(vehicle.channel, vehicle.interface)
     finally:
         shutdown_bus()
-        terminate_ecus()
\ No newline at end of file
+        terminate_ecus()
+        release_masks()
\ No newline at end of file
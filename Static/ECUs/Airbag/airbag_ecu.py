@@ -2,7 +2,6 @@
 # Cooldown of 5s where airbag cannot deploy
 # Periodically broadcasts 0x501 airbag status every 1s
 
-import threading
 import signal
 import sys
 import time
@@ -20,6 +19,9 @@ class AirbagECU(CANNode):
         self.listen_crash = 0x402
         self.listen_status = 0x501
         self.broadcast_status = 0x501
+        self.status_broadcast = self.cyclic(self.broadcast_status, [self.status, 0xDE])
+        self.handle(self.listen_crash, self.on_crash, DEPLOY)
+        self.handle(self.listen_status, self.on_status)
 
     def start(self):
         """
@@ -28,41 +30,52 @@ class AirbagECU(CANNode):
         super().start()
         self.start_status_broadcast()
 
-    def on_message(self, msg):
+    def on_crash(self, msg):
         """
-        Process incoming CAN messages:
-        - Crash detector trigger (0x402)
-        - Status update messages (0x501)
+        Deploy on a crash detector trigger (0x402).
         """
-        if msg.arbitration_id == self.listen_crash and list(msg.data[0:2]) == DEPLOY:
-            if self.status == 0x01:
-                print(f"[STATIC AIRBAG ECU] Airbag already deployed.")
-                return
+        if self.status == 0x01:
+            print(f"[STATIC AIRBAG ECU] Airbag already deployed.")
+            return
 
-            self.status = 0x01
-            self.last_deploy_time = time.time()
-            print(f"[STATIC AIRBAG ECU] AIRBAG DEPLOYED!")
+        self.last_deploy_time = time.time()
+        self.set_status(0x01)
+        print(f"[STATIC AIRBAG ECU] AIRBAG DEPLOYED!")
 
-        # This is for demonstration purposes to allow spoofing
-        elif msg.arbitration_id == self.listen_status:
-            incoming_status = msg.data[0]
-            self.status = incoming_status
-            
+    def on_status(self, msg):
+        """
+        Adopt status updates (0x501).
+        This is for demonstration purposes to allow spoofing
+        Our own broadcasts looped back on the same ID are ignored, otherwise an old
+        status still in flight could undo a deployment.
+        """
+        if self.status_broadcast.is_echo(msg):
+            return
+        incoming_status = msg.data[0]
+        self.set_status(incoming_status)
 
-    def start_status_broadcast(self):
+    def set_status(self, status):
         """
-        Periodically broadcast airbag status.
+        Change the airbag status and the broadcast payload.
         """
-        def loop():
-            while self.running:
-                # Auto-reset status after cooldown
-                if self.status == 0x01 and (time.time() - self.last_deploy_time > self.cooldown):
-                    self.status = 0x00
+        self.status = status
+        self.status_broadcast.update([self.status, 0xDE])
 
-                self.send_message(self.broadcast_status, [self.status] + [0xDE])
-                time.sleep(1.0)
+    def reset_status(self):
+        """
+        Auto-reset status after cooldown, checked every broadcast period.
+        """
+        if self.status == 0x01 and time.time() - self.last_deploy_time > self.cooldown:
+            self.set_status(0x00)
 
-        threading.Thread(target=loop, daemon=True).start()
+    def start_status_broadcast(self):
+        """
+        Periodically broadcast airbag status.
+        The payload is only updated when the status changes.
+        """
+        self.status_broadcast.start()
+        # The cooldown is checked on its own periodic job, the broadcast only carries the frame
+        self.every(self.period, self.reset_status)
 
     def shutdown(self):
         self.running = False
@@ -70,7 +83,7 @@ class AirbagECU(CANNode):
 
 
 if __name__ == "__main__":
-    ecu = AirbagECU("STATIC AIRBAG ECU", bus_name="vcan0")
+    ecu = AirbagECU.from_args("STATIC AIRBAG ECU")
 
     def handle_sigint(sig, frame):
         ecu.shutdown()
@@ -79,6 +92,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
@@ -2,7 +2,6 @@
 # If OFF: Waits 1.0s, sends readiness signal, then starts voltage broadcast
 # If ON: Waits 1.0s, stops voltage broadcast and signals shutdown
 
-import threading
 import signal
 import sys
 import time
@@ -19,6 +18,7 @@ class BatteryECU(CANNode):
         super().__init__(node_id, **kwargs)
         self.broadcast_id = 0x701           # ID for readiness and voltage
         self.control_id = 0x001             # Ignition startup/shutdown command
+        self.handle(self.control_id, self.on_control, [COMMAND_CONTROL])
         self.running = True                 
         self.started = False                
 
@@ -26,15 +26,14 @@ class BatteryECU(CANNode):
         super().start()
         self.start_voltage_broadcast_loop()
 
-    def on_message(self, msg):
+    def on_control(self, msg):
         """
-        Toggle between startup and shutdown
+        Ignition command (0x001): start up or shut down after the readiness delay.
         """
-        if msg.arbitration_id == self.control_id and msg.data[0] == COMMAND_CONTROL:
-            if not self.started:
-                threading.Timer(1.0, self._handle_startup).start()
-            else:
-                threading.Timer(1.0, self._handle_shutdown).start()
+        if not self.started:
+            self.after(1.0, self._handle_startup)
+        else:
+            self.after(1.0, self._handle_shutdown)
 
     def _handle_startup(self):
         """
@@ -57,20 +56,18 @@ class BatteryECU(CANNode):
         Broadcasts voltage only when system is 'started'.
         """
         def loop():
-            if self.running:
-                if self.started:
-                    voltage = random.randint(115, 125)  # Random voltage
-                    self.send_message(self.broadcast_id, [0]*3 + [voltage])
-                threading.Timer(1.0, loop).start()
+            if self.started:
+                voltage = random.randint(115, 125)  # Random voltage
+                self.send_message(self.broadcast_id, [0]*3 + [voltage])
 
-        loop()
+        self.every(self.period, loop)
 
     def shutdown(self):
         self.running = False
         self.stop()
 
 if __name__ == "__main__":
-    ecu = BatteryECU("STATIC BATTERY ECU", bus_name="vcan0")
+    ecu = BatteryECU.from_args("STATIC BATTERY ECU")
 
     def handle_sigint(sig, frame):
 
@@ -80,6 +77,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
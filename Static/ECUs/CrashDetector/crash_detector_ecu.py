@@ -2,7 +2,6 @@
 # Sends deploy signal (0x402) if threshold exceeded
 
 import time
-import threading
 import signal
 import sys
 from can_node import CANNode
@@ -12,45 +11,34 @@ class CrashDetectorECU(CANNode):
         super().__init__(node_id, **kwargs)
         self.threshold = threshold
         self.latest_force = 0
+        self.cooldown = 1.0                 # Seconds before another deploy can be sent
+        self.last_deploy = float("-inf")
         self.running = True
         self.listen_force = 0x401
         self.broadcast_id = 0x402
+        self.handle(self.listen_force, self.on_force)
 
-    def start(self):
+    def on_force(self, msg):
         """
-        Start CAN listener and background force monitoring thread.
+        G-force reading (0x401): send the deploy command (0x402) as soon as a reading
+        exceeds the threshold, at most once per cooldown to avoid rapid redeploys.
         """
-        super().start()
-        self.start_force_monitor()
+        self.latest_force = msg.data[0]
+        if self.latest_force <= self.threshold:
+            return
 
-    def on_message(self, msg):
-        """
-        Process incoming CAN messages:
-        - G-force readings (ID 0x401)
-        """
-        if msg.arbitration_id == self.listen_force:
-            self.latest_force = msg.data[0]
-
-    def start_force_monitor(self):
-        """
-        Checks the latest G-force. 
-        Sends deploy command if threshold exceeded.
-        """
-        def monitor():
-            while self.running:
-                if self.latest_force > self.threshold:
-                    self.send_message(self.broadcast_id, [0xDE] + [0x99])
-                    time.sleep(1.0)  # Cooldown to avoid rapid redeploys
-                time.sleep(0.1)
-
-        threading.Thread(target=monitor, daemon=True).start()
+        now = time.monotonic()
+        if now - self.last_deploy < self.cooldown:
+            return
+        self.last_deploy = now
+        self.send_message(self.broadcast_id, [0xDE] + [0x99])
 
     def shutdown(self):
         self.running = False
         self.stop()
 
 if __name__ == "__main__":
-    ecu = CrashDetectorECU("STATIC CRASH DETECTOR ECU", bus_name="vcan0")
+    ecu = CrashDetectorECU.from_args("STATIC CRASH DETECTOR ECU")
 
     def handle_sigint(sig, frame):
 
@@ -60,6 +48,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
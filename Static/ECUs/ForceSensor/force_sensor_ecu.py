@@ -3,7 +3,6 @@
 # Sends one high G-force value to simulate crash on demand
 
 import random
-import threading
 import signal
 import sys
 import time
@@ -17,8 +16,9 @@ class ForceSensorECU(CANNode):
         super().__init__(node_id, **kwargs)
         self.control_id = 0x001                   # Listen for ignition control messages
         self.broadcast_id = 0x401                 # G-force readings broadcast ID
+        self.handle(self.control_id, self.on_control, [CONTROL_COMMAND])
         self.running = True                       
-        self._loop_thread = None                  
+        self._loop_job = None                    
 
     def start(self):
         """
@@ -27,28 +27,21 @@ class ForceSensorECU(CANNode):
         super().start()
         self._start_safe_force_loop()
 
-    def on_message(self, msg):
+    def on_control(self, msg):
         """
-        Process incoming CAN messages:
-        - Control messages (ID 0x001) to trigger a crash.
+        Control message (0x001): trigger a crash on command.
         """
-        if msg.arbitration_id == self.control_id:
-                        
-            if msg.data[0] == CONTROL_COMMAND:
-                self.simulate_crash()
+        self.simulate_crash()
 
     def _start_safe_force_loop(self):
         """
         Broadcast random safe G-force readings.
         """
         def loop():
-            while self.running:
-                safe_force = random.randint(5, 40)  # Normal forces
-                self.send_message(self.broadcast_id, [safe_force] + [0x2A])
-                time.sleep(1.0)
+            safe_force = random.randint(5, 40)  # Normal forces
+            self.send_message(self.broadcast_id, [safe_force] + [0x2A])
 
-        self._loop_thread = threading.Thread(target=loop, daemon=True)
-        self._loop_thread.start()
+        self._loop_job = self.every(self.period, loop)
 
     def simulate_crash(self):
         """
@@ -63,7 +56,7 @@ class ForceSensorECU(CANNode):
         self.stop()
 
 if __name__ == "__main__":
-    ecu = ForceSensorECU("STATIC FORCE SENSOR ECU", bus_name="vcan0")
+    ecu = ForceSensorECU.from_args("STATIC FORCE SENSOR ECU")
 
     def handle_sigint(sig, frame):
         ecu.shutdown()
@@ -72,6 +65,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
@@ -2,7 +2,6 @@
 # If OFF: Waits 2.0s, sends readiness signal, then starts fuel level broadcasts
 # If ON: Waits 2.0s, sends shutdown signal, then stops broadcasting
 
-import threading
 import signal
 import sys
 import time
@@ -19,6 +18,7 @@ class FuelECU(CANNode):
         super().__init__(node_id, **kwargs)
         self.broadcast_id = 0x702           # ID for readiness and fuel level
         self.control_id = 0x001             # Ignition command ID
+        self.handle(self.control_id, self.on_control, [COMMAND_CONTROL])
         self.running = True                 
         self.started = False                
 
@@ -26,15 +26,14 @@ class FuelECU(CANNode):
         super().start()
         self.start_fuel_broadcast_loop()
 
-    def on_message(self, msg):
+    def on_control(self, msg):
         """
-        Toggle between startup and shutdown
+        Ignition command (0x001): start up or shut down after the readiness delay.
         """
-        if msg.arbitration_id == self.control_id and msg.data[0] == COMMAND_CONTROL:
-            if not self.started:
-                threading.Timer(2.0, self._handle_startup).start()
-            else:
-                threading.Timer(2.0, self._handle_shutdown).start()
+        if not self.started:
+            self.after(2.0, self._handle_startup)
+        else:
+            self.after(2.0, self._handle_shutdown)
 
     def _handle_startup(self):
         """
@@ -57,13 +56,11 @@ class FuelECU(CANNode):
         Broadcasts simulated fuel level every second,
         """
         def loop():
-            if self.running:
-                if self.started:
-                    fuel_level = random.randint(30, 100)  # Simulate fuel 
-                    self.send_message(self.broadcast_id, [0x0F]*2 + [fuel_level])
-                threading.Timer(1.0, loop).start()
+            if self.started:
+                fuel_level = random.randint(30, 100)  # Simulate fuel 
+                self.send_message(self.broadcast_id, [0x0F]*2 + [fuel_level])
 
-        loop()
+        self.every(self.period, loop)
 
     def shutdown(self):
 
@@ -71,7 +68,7 @@ class FuelECU(CANNode):
         self.stop()
 
 if __name__ == "__main__":
-    ecu = FuelECU("STATIC FUEL ECU", bus_name="vcan0")
+    ecu = FuelECU.from_args("STATIC FUEL ECU")
 
     def handle_sigint(sig, frame):
 
@@ -81,6 +78,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
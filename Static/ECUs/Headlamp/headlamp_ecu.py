@@ -2,7 +2,6 @@
 # Changes headlamp ON/OFF state accordingly
 # Periodically broadcasts headlamp status (ID 0x301) using:
 
-import threading
 import signal
 import sys
 import time
@@ -21,6 +20,9 @@ class HeadlampECU(CANNode):
         self.headlight_state = False       # Headlight initially OFF
         self.listen_id = 0x201             # Listen for headlamp toggle commands
         self.broadcast_id = 0x301          # Broadcast headlamp status
+        self.status_broadcast = self.cyclic(self.broadcast_id, STATUS_OFF)
+        self.handle(self.listen_id, self.on_toggle_on, TOGGLE_ON)
+        self.handle(self.listen_id, self.on_toggle_off, TOGGLE_OFF)
         self.running = True                
 
     def start(self):
@@ -30,42 +32,37 @@ class HeadlampECU(CANNode):
         super().start()
         self.start_status_broadcast()
 
-    def on_message(self, msg):
+    def on_toggle_on(self, msg):
         """
-        Process incoming CAN messages:
-        - Headlamp toggle commands (ID 0x201)
+        Headlamp toggle ON command (0x201).
         """
-        if msg.arbitration_id == self.listen_id:
+        if not self.headlight_state:
+            self.headlight_state = True
+            self.status_broadcast.update(STATUS_ON)
+            print(f"[STATIC HEADLAMP ECU] Headlights turned ON")
 
-            if list(msg.data[0:3]) == TOGGLE_ON and not self.headlight_state:
-                self.headlight_state = True
-                print(f"[STATIC HEADLAMP ECU] Headlights turned ON")
-
-            elif list(msg.data[0:3]) == TOGGLE_OFF and self.headlight_state:
-                self.headlight_state = False
-                print(f"[STATIC HEADLAMP ECU] Headlights turned OFF")
+    def on_toggle_off(self, msg):
+        """
+        Headlamp toggle OFF command (0x201).
+        """
+        if self.headlight_state:
+            self.headlight_state = False
+            self.status_broadcast.update(STATUS_OFF)
+            print(f"[STATIC HEADLAMP ECU] Headlights turned OFF")
 
     def start_status_broadcast(self):
         """
         Periodically broadcast headlamp ON/OFF status every 1 second.
+        The payload is only updated on toggles.
         """
-        def loop():
-            if self.running:
-                if self.headlight_state:
-                    payload = STATUS_ON
-                else:
-                    payload = STATUS_OFF
-
-                self.send_message(self.broadcast_id, payload)
-                threading.Timer(1.0, loop).start()
-        loop()
+        self.status_broadcast.start()
 
     def shutdown(self):
         self.running = False
         self.stop()
 
 if __name__ == "__main__":
-    ecu = HeadlampECU("STATIC HEADLAMP ECU", bus_name="vcan0")
+    ecu = HeadlampECU.from_args("STATIC HEADLAMP ECU")
 
     def handle_sigint(sig, frame):
         ecu.shutdown()
@@ -74,6 +71,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
@@ -5,6 +5,7 @@
 import signal
 import sys
 import time
+from functools import partial
 from can_node import CANNode
 
 # CAN payloads 
@@ -19,24 +20,23 @@ class HeadlightSwitchECU(CANNode):
         self.control_id = 0x001                 # Listen for ignition control messages
         self.listen_id = 0x301                  # Listen for headlamp ON/OFF status updates
         self.broadcast_id = 0x201               # Send toggle commands to Headlamp ECU
+        self.headlight_state_on = False         # Headlamp is off until its status says otherwise
+        self.handle(self.listen_id, partial(self.on_status, True), STATUS_ON)
+        self.handle(self.listen_id, partial(self.on_status, False))
+        self.handle(self.control_id, self.on_control, [CONTROL_COMMAND])
         self.running = True                     
 
-    def on_message(self, msg):
+    def on_status(self, on, msg):
         """
-        Processes incoming CAN messages:
-        - Headlamp status updates (0x301) from Headlamp ECU
-        - Control commands (0x001) from ignition.py
+        Listens to headlamp status (0x301) and defines when it is on.
         """
-        # Listens to headlamp status and defines when it is on
-        if msg.arbitration_id == self.listen_id:
-            self.headlight_state_on = list(msg.data[0:3]) == STATUS_ON
-            return
+        self.headlight_state_on = on
 
-        # Checks if it is recieving a control command
-        if msg.arbitration_id == self.control_id:
-            if msg.data[0] == CONTROL_COMMAND:
-                self.toggle()
-                return
+    def on_control(self, msg):
+        """
+        Control command (0x001) from ignition.py.
+        """
+        self.toggle()
 
     def toggle(self):
         """
@@ -52,7 +52,7 @@ class HeadlightSwitchECU(CANNode):
         self.stop()
 
 if __name__ == "__main__":
-    ecu = HeadlightSwitchECU("STATIC HEADLIGHT SWITCH ECU", bus_name="vcan0")
+    ecu = HeadlightSwitchECU.from_args("STATIC HEADLIGHT SWITCH ECU")
 
     def handle_sigint(sig, frame):
         ecu.shutdown()
@@ -61,6 +61,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
@@ -2,10 +2,10 @@
 # Interprets toggle ON/OFF and hazard ON/OFF
 # Broadcasts current status (ID 0x602)
 
-import threading
 import signal
 import sys
 import time
+from functools import partial
 from can_node import CANNode
 
 LEFT_ON = [0x10, 0x00, 0xC1]
@@ -22,56 +22,39 @@ class LeftIndicatorECU(CANNode):
         self.hazard_mode = False             
         self.listen_id = 0x601               # Receive commands on this ID
         self.broadcast_id = 0x602            # Broadcast status on this ID
+        self.status_broadcast = self.cyclic(self.broadcast_id, STATUS_OFF + [0]*2)
+        self.handle(self.listen_id, partial(self.on_command, True, False, "Left Indicator ON"), LEFT_ON)
+        self.handle(self.listen_id, partial(self.on_command, False, False, "Left Indicator OFF"), LEFT_OFF)
+        self.handle(self.listen_id, partial(self.on_command, True, True, "Hazard Lights (Left) ON"), HAZARD_ON)
+        self.handle(self.listen_id, partial(self.on_command, False, False, "Hazard Lights (Left) OFF"), HAZARD_OFF)
         self.running = True                  
 
     def start(self):
         super().start()
         self.start_status_broadcast()
 
-    def on_message(self, msg):
+    def on_command(self, active, hazard_mode, label, msg):
         """
-        Process incoming CAN messages:
-        - Listen for indicator or hazard control commands (ID 0x601)
+        Indicator or hazard control command (0x601), bound to its payload in __init__.
         """
-        if msg.arbitration_id == self.listen_id:
-            if list(msg.data[0:3]) == LEFT_ON:
-                self.active = True
-                self.hazard_mode = False
-                print(f"[STATIC LEFT INDICATOR ECU] Left Indicator ON")
-
-            elif list(msg.data[0:3]) == LEFT_OFF:
-                self.active = False
-                self.hazard_mode = False
-                print(f"[STATIC LEFT INDICATOR ECU] Left Indicator OFF")
-
-            elif list(msg.data[0:3]) == HAZARD_ON:
-                self.active = True
-                self.hazard_mode = True
-                print(f"[STATIC LEFT INDICATOR ECU] Hazard Lights (Left) ON")
-
-            elif list(msg.data[0:3]) == HAZARD_OFF:
-                self.active = False
-                self.hazard_mode = False
-                print(f"[STATIC LEFT INDICATOR ECU] Hazard Lights (Left) OFF")
+        self.active = active
+        self.hazard_mode = hazard_mode
+        print(f"[STATIC LEFT INDICATOR ECU] {label}")
+        self.status_broadcast.update((STATUS_ON if self.active else STATUS_OFF) + [0]*2)
 
     def start_status_broadcast(self):
         """
         Broadcast indicator status every 1 second.
+        The payload is only updated on commands.
         """
-        def loop():
-            if self.running:
-                status = STATUS_ON if self.active else STATUS_OFF
-                self.send_message(self.broadcast_id, status + [0]*2)
-                threading.Timer(1.0, loop).start()
-
-        loop()
+        self.status_broadcast.start()
 
     def shutdown(self):
         self.running = False
         self.stop()
 
 if __name__ == "__main__":
-    ecu = LeftIndicatorECU("STATIC LEFT INDICATOR ECU", bus_name="vcan0")
+    ecu = LeftIndicatorECU.from_args("STATIC LEFT INDICATOR ECU")
 
     def handle_sigint(sig, frame):
 
@@ -81,6 +64,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, handle_sigint)
 
     ecu.start()
+    ecu.report_ready()
 
     try:
         while ecu.running:
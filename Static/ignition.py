@@ -1,49 +1,54 @@
 # Central controller for launching and managing ECUs
 
-import subprocess
-import time
-import signal
+import os
+import sys
 import readchar
 import can
 
-ecu_processes = []
+# The shared launcher helpers live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ecu_launcher
+import topology
+
+launches = []
 running = True
 bus = None  
 
-def launch_ecus():
+def launch(ecu):
+    """
+    Start one ECU process of the topology that reports when it is ready.
+    """
+    launches.append(ecu_launcher.spawn(ecu.name, ecu.args(), cwd=topology.ROOT))
+
+def wait_for_ecus(timeout=10.0):
+    """
+    Wait until every launched ECU is listening, then report the boot times.
+    """
+    ecu_launcher.wait_ready(launches, timeout)
+    ecu_launcher.report_boot(launches)
+
+def launch_ecus(vehicle):
     """
-    Launch ECU subprocesses.
+    Launch the Static ECUs of the topology as subprocesses.
     """
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/HeadlampSwitch/headlamp_switch_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/Headlamp/headlamp_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/ForceSensor/force_sensor_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/CrashDetector/crash_detector_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/Airbag/airbag_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/IndicatorSwitch/indicator_switch_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/LeftIndicator/left_indicator_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/RightIndicator/right_indicator_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/Battery/battery_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/FuelSystem/fuel_system_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/EngineControl/engine_control_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "ECUs/StarterMotor/starter_motor_ecu.py"]))
+    for ecu in vehicle.ecus:
+        launch(ecu)
 
 def terminate_ecus():
-    for proc in ecu_processes:
-        try:
-            proc.send_signal(signal.SIGINT)
-            proc.wait(timeout=2)
-        except subprocess.TimeoutExpired:
-            proc.kill()
+    """
+    Stop all ECUs in parallel, killing any that are still running after the shutdown deadline.
+    """
+    ecu_launcher.terminate(launches)
     print("[Ignition] All ECUs terminated.")
 
-def input_loop():
+def input_loop(channel="vcan0", interface="socketcan"):
     """
     Handles user input and sends CAN messages accordingly.
     """
     global running
     global bus
 
-    bus = can.interface.Bus(channel="vcan0", interface="socketcan")
+    bus = can.interface.Bus(channel=channel, interface=interface)
     print("\nEnter Input — [1] Toggle Headlights, [2] Trigger Crash, [3] Start Engine, [←] Left Indicator, [→] Right Indicator, [↑] Hazard, [q] Quit:")
 
     while running:
@@ -101,9 +106,10 @@ def shutdown_bus():
 
 if __name__ == "__main__":
     try:
-        launch_ecus()
-        time.sleep(1.0)  # Let ECUs boot
-        input_loop()
+        vehicle = topology.load().select(variants=["Static"])
+        launch_ecus(vehicle)
+        wait_for_ecus()
+        input_loop(vehicle.channel, vehicle.interface)
     finally:
         shutdown_bus()
         terminate_ecus()
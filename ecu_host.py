@@ -0,0 +1,185 @@
+# Runs several ECUs in one interpreter on one shared CAN socket
+# Loads the *_ecu.py classes of a variant (or a chosen subset), receives every frame once
+# and hands it to the on_message of each ECU listening to its ID. Frames the hosted ECUs
+# send are handed to the other hosted ECUs directly, never back to the sender.
+# Usage:
+#     python3 ecu_host.py MTD
+#     python3 ecu_host.py Static --only Airbag ForceSensor CrashDetector
+
+import argparse
+import collections
+import os
+import re
+import signal
+import sys
+import threading
+import time
+import can
+import ecu_loader
+
+class ECUHost:
+    def __init__(self, scripts, channel='vcan0', interface='socketcan'):
+        self.bus = can.interface.Bus(channel, interface=interface)
+        self.running = False
+        self.ecus = [self._create(script) for script in scripts]
+        # One TX queue and writer thread sends for every hosted ECU
+        self.tx = sys.modules["can_node"].TxQueue(self.bus)
+        self.tx.on_sent = self.loop_back
+        for ecu in self.ecus:
+            ecu.tx = self.tx
+        self.sent = collections.deque()     # (frame, sending ECU) awaiting delivery to the other ECUs
+        self.sent_ready = threading.Condition()
+        self.deliver_lock = threading.Lock()
+        self.routes = {}            # Arbitration ID -> ECUs listening to it
+        self.catch_all = ()         # ECUs without a filter receive every frame
+        periods = [ecu.filter_period for ecu in self.ecus if ecu.filter_period]
+        self.filter_period = min(periods) if periods else None
+
+    def _create(self, script):
+        """
+        Instantiate the ECU class of a script on the shared bus.
+        """
+        variant, _, ecu_dir = script.split(os.sep)[:3]
+        name = f"{variant} {re.sub(r'(?<!^)(?=[A-Z])', ' ', ecu_dir)} ECU".upper()
+        return ecu_loader.load_ecu_class(script)(name, bus=self.bus)
+
+    def start(self):
+        """
+        Start every ECU, then the shared receive loop.
+        """
+        self.running = True
+        for ecu in self.ecus:
+            ecu.start()
+        self.apply_routes()
+        threading.Thread(target=self.receive_loop, daemon=True).start()
+        threading.Thread(target=self.loopback_loop, daemon=True).start()
+        if self.filter_period:
+            threading.Thread(target=self.route_loop, daemon=True).start()
+        sys.modules["can_node"].notify_ready()
+
+    def apply_routes(self):
+        """
+        Rebuild the ID -> ECU table and install the union of the ECUs' IDs as the kernel filter.
+        """
+        routes, catch_all = {}, []
+        for ecu in self.ecus:
+            ids = ecu.filter_ids()
+            if not ids:
+                catch_all.append(ecu)
+            for can_id in ids:
+                routes.setdefault(can_id, []).append(ecu)
+
+        self.routes = {can_id: tuple(ecus) for can_id, ecus in routes.items()}
+        self.catch_all = tuple(catch_all)
+
+        if not catch_all:
+            self.bus.set_filters([
+                {"can_id": can_id, "can_mask": 0x7FF, "extended": False} for can_id in sorted(routes)
+            ])
+
+    def route_loop(self):
+        """
+        Follow rotating MTD IDs by rebuilding the routes just after every period boundary.
+        """
+        while self.running:
+            now = time.time()
+            time.sleep(max(0.0, min(ecu.next_boundary(now) for ecu in self.ecus if ecu.filter_period) - now))
+            try:
+                self.apply_routes()
+            except (OSError, can.CanError):
+                break
+
+    def receive_loop(self):
+        """
+        Receive each frame once and fan it out to the listening ECUs.
+        """
+        while self.running:
+            try:
+                msg = self.bus.recv(timeout=1.0)
+            except (OSError, can.CanError):
+                break
+            if msg is not None:
+                self.deliver(msg)
+
+    def loop_back(self, msg, origin):
+        """
+        Queue a frame the TX queue has just sent for the hosted ECUs other than its sender.
+        Runs on the writer thread, which must not call handlers that may queue frames themselves.
+        """
+        msg.timestamp = time.time()
+        with self.sent_ready:
+            self.sent.append((msg, origin))
+            self.sent_ready.notify()
+
+    def loopback_loop(self):
+        """
+        Hand frames sent by hosted ECUs to the other hosted ECUs listening to them.
+        """
+        while self.running:
+            with self.sent_ready:
+                while not self.sent and self.running:
+                    self.sent_ready.wait(1.0)
+                if not self.sent:
+                    return
+                msg, origin = self.sent.popleft()
+            self.deliver(msg, origin)
+
+    def deliver(self, msg, origin=None):
+        """
+        Hand a frame to the ECUs listening to its ID, except origin. One frame at a time,
+        whether it came from the bus or from a hosted ECU.
+        """
+        with self.deliver_lock:
+            for ecu in self.routes.get(msg.arbitration_id, ()) + self.catch_all:
+                if ecu is origin:
+                    continue
+                try:
+                    ecu.on_message(msg)
+                except Exception as e:
+                    print(f"[{ecu.node_id}] Warning: Handler failed — {e}")
+
+    def shutdown(self):
+        """
+        Shut down every ECU, then the shared bus.
+        """
+        self.running = False
+        with self.sent_ready:
+            self.sent_ready.notify()
+        for ecu in self.ecus:
+            ecu.shutdown()
+        self.tx.close()
+        self.bus.shutdown()
+
+def select_scripts(variant, only=None):
+    """
+    ECU scripts of a variant, optionally limited to the named ECU directories.
+    """
+    scripts = ecu_loader.variant_scripts(variant)
+    if only:
+        wanted = {name.lower() for name in only}
+        scripts = [s for s in scripts if s.split(os.sep)[2].lower() in wanted]
+    return scripts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a variant's ECUs in one process")
+    parser.add_argument("variant", choices=["Static", "MTD"])
+    parser.add_argument("--only", nargs="+", metavar="ECU", help="ECU directories to load, e.g. Airbag Headlamp")
+    parser.add_argument("--channel", default="vcan0")
+    parser.add_argument("--interface", default="socketcan")
+    args = parser.parse_args()
+
+    host = ECUHost(select_scripts(args.variant, args.only), channel=args.channel, interface=args.interface)
+
+    def handle_sigint(sig, frame):
+        host.shutdown()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, handle_sigint)
+
+    host.start()
+
+    try:
+        while host.running:
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        host.shutdown()
@@ -0,0 +1,254 @@
+# Starts ECU processes and waits until they report that they are listening
+# Each child gets the write end of a pipe in ECU_READY_FD. CANNode.report_ready writes to it
+# once the ECU's start() has returned, with its bus socket, threads and broadcasts up, and
+# the launcher waits on all the pipes at once instead of sleeping and hoping the ECUs have booted.
+# ECUs are either started as fresh interpreters (spawn) or forked from a launcher that has
+# already imported python-can and the AES cipher (fork), so the children share those pages.
+
+import importlib
+import os
+import runpy
+import selectors
+import signal
+import subprocess
+import sys
+import time
+import traceback
+
+# Modules every ECU imports, loaded once in the launcher before it forks.
+# mtd is the repository root copy: every MTD/ECUs/*/mtd.py is identical to it, so forked
+# MTD ECUs deliberately reuse it and its mask table from sys.modules instead of importing
+# their own. It has to be imported after MTD_MASK_CACHE and the shared table are set up.
+PRELOAD = ("can", "can.interfaces.socketcan", "Crypto.Cipher.AES", "mtd")
+
+class Launch:
+    """
+    One launched ECU process and its readiness pipe.
+    """
+    def __init__(self, name, proc, ready_fd, started):
+        self.name = name
+        self.proc = proc
+        self.ready_fd = ready_fd
+        self.started = started
+        self.boot_time = None           # Seconds from launch to ready, None until it reports
+
+def spawn(name, args, cwd=None):
+    """
+    Start "python3 args..." with a readiness pipe and return its Launch.
+    """
+    read_fd, write_fd = os.pipe()
+    env = dict(os.environ, ECU_READY_FD=str(write_fd))
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen(["python3"] + list(args), cwd=cwd, env=env, pass_fds=(write_fd,))
+    except OSError:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    return Launch(name, proc, read_fd, started)
+
+class ForkedProcess:
+    """
+    The subprocess.Popen calls ignition uses, for a child created with os.fork.
+    """
+    def __init__(self, pid):
+        self.pid = pid
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+            if pid:
+                self.returncode = os.waitstatus_to_exitcode(status)
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(f"pid {self.pid}", timeout)
+            time.sleep(0.01)
+        return self.returncode
+
+    def send_signal(self, sig):
+        if self.returncode is None:
+            os.kill(self.pid, sig)
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+def warm_imports(modules=PRELOAD):
+    """
+    Import the modules ECUs share so forked children inherit them instead of loading them again.
+    """
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"[Ignition] Warning: Could not preload {name} — {e}")
+
+def fork(name, args, cwd=None):
+    """
+    Fork a child that runs "python3 args..." with a readiness pipe and return its Launch.
+    Must be called before the launcher starts threads or opens a bus, since the child
+    inherits its memory but only the calling thread.
+    """
+    read_fd, write_fd = os.pipe()
+    started = time.perf_counter()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        code = 0
+        try:
+            _run_script(args, cwd, write_fd)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+    os.close(write_fd)
+    return Launch(name, ForkedProcess(pid), read_fd, started)
+
+def _run_script(args, cwd, ready_fd):
+    """
+    Turn a forked child into "python3 args...".
+    """
+    if cwd:
+        os.chdir(cwd)
+    path = os.path.abspath(args[0])
+    os.environ["ECU_READY_FD"] = str(ready_fd)
+    sys.argv = [path] + list(args[1:])
+    # Like a fresh interpreter, the script's own directory resolves can_node and mtd first
+    sys.path[0] = os.path.dirname(path)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    runpy.run_path(path, run_name="__main__")
+
+def wait_ready(launches, timeout=10.0):
+    """
+    Wait on every readiness pipe at once until all ECUs reported or timeout seconds passed.
+    Sets boot_time on the ECUs that reported and returns the ones that did not,
+    either because they exited first or because they are still booting.
+    """
+    selector = selectors.DefaultSelector()
+    for launch in launches:
+        if launch.boot_time is None and launch.ready_fd is not None:
+            selector.register(launch.ready_fd, selectors.EVENT_READ, launch)
+
+    deadline = time.perf_counter() + timeout
+    while selector.get_map():
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        for key, _ in selector.select(remaining):
+            launch = key.data
+            # A line means ready, end of file means the process exited without reporting
+            if os.read(launch.ready_fd, 64):
+                launch.boot_time = time.perf_counter() - launch.started
+            selector.unregister(launch.ready_fd)
+            os.close(launch.ready_fd)
+            launch.ready_fd = None
+    selector.close()
+
+    for launch in launches:
+        if launch.ready_fd is not None:
+            os.close(launch.ready_fd)
+            launch.ready_fd = None
+    return [launch for launch in launches if launch.boot_time is None]
+
+def report_boot(launches, stream=sys.stdout):
+    """
+    Print per-ECU boot times, slowest first, and the time until the whole vehicle was ready.
+    """
+    ready = sorted((l for l in launches if l.boot_time is not None), key=lambda l: l.boot_time, reverse=True)
+    for launch in ready:
+        print(f"[Ignition]   {launch.name:<48} {launch.boot_time * 1e3:7.1f} ms", file=stream)
+    for launch in launches:
+        if launch.boot_time is None:
+            state = "exited" if launch.proc.poll() is not None else "not ready"
+            print(f"[Ignition]   {launch.name:<48} {state}", file=stream)
+    total = f"{ready[0].boot_time:.2f} s" if ready else "-"
+    print(f"[Ignition] {len(ready)}/{len(launches)} ECUs ready in {total}", file=stream)
+
+def terminate(launches, timeout=3.0, slow=0.5, stream=sys.stdout):
+    """
+    Stop every launched process against one deadline: SIGINT to all of them at once,
+    wait for them together, then SIGKILL whatever is still running after timeout seconds.
+    Reports ECUs that took longer than slow seconds or had to be killed and returns
+    the exit time of each ECU, None for the killed ones.
+    """
+    started = time.monotonic()
+    for launch in launches:
+        try:
+            launch.proc.send_signal(signal.SIGINT)
+        except OSError:
+            pass
+
+    exit_times = {}
+    pending = list(launches)
+    deadline = started + timeout
+    while pending:
+        pending = [launch for launch in pending if launch.proc.poll() is None]
+        now = time.monotonic()
+        for launch in launches:
+            if launch not in exit_times and launch not in pending:
+                exit_times[launch] = now - started
+        if not pending or now >= deadline:
+            break
+        time.sleep(0.01)
+
+    for launch in pending:
+        exit_times[launch] = None
+        try:
+            launch.proc.kill()
+        except OSError:
+            pass
+    for launch in pending:
+        launch.proc.wait()
+
+    for launch in launches:
+        seconds = exit_times[launch]
+        if seconds is None:
+            print(f"[Ignition]   {launch.name:<48} killed after {timeout:.1f} s", file=stream)
+        elif seconds > slow:
+            print(f"[Ignition]   {launch.name:<48} slow, stopped after {seconds:.2f} s", file=stream)
+    print(f"[Ignition] {len(launches)} ECUs stopped in {time.monotonic() - started:.2f} s", file=stream)
+    return {launch.name: seconds for launch, seconds in exit_times.items()}
+
+def summed_memory(launches):
+    """
+    Summed RSS, PSS and USS in MiB of the launched processes still running.
+    PSS splits pages shared copy-on-write between the processes sharing them.
+    """
+    import psutil
+
+    totals = {}
+    for launch in launches:
+        try:
+            info = psutil.Process(launch.proc.pid).memory_full_info()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        for field in ("rss", "pss", "uss"):
+            if hasattr(info, field):
+                totals[field] = totals.get(field, 0.0) + getattr(info, field) / 2**20
+    return totals
+
+def report_memory(launches, stream=sys.stdout):
+    """
+    Print the summed memory of the launched processes.
+    """
+    try:
+        totals = summed_memory(launches)
+    except ImportError:
+        return
+    figures = ", ".join(f"{field.upper()} {mib:.1f} MiB" for field, mib in totals.items())
+    print(f"[Ignition] Memory of {len(launches)} processes — {figures}", file=stream)
@@ -0,0 +1,46 @@
+# Loads ECU classes from their scripts, so several ECUs can share one interpreter
+
+import glob
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def variant_scripts(variant):
+    """
+    Return the ECU scripts of a variant ("Static" or "MTD"), relative to the repository root.
+    """
+    return sorted(os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, variant, "ECUs", "*", "*_ecu.py")))
+
+def load_ecu_class(script_path):
+    """
+    Import an ECU script and return the CANNode subclass it defines.
+
+    The script's directory is put on sys.path while it is imported, so its
+    "from can_node import ..." and "from mtd import ..." resolve the same way
+    as when the script runs on its own. Every copy of those modules is
+    identical, so the first one imported serves all ECUs.
+    """
+    script_path = os.path.join(ROOT, script_path)
+    directory = os.path.dirname(script_path)
+    variant = os.path.basename(os.path.dirname(os.path.dirname(directory)))
+    name = f"{variant}_{os.path.splitext(os.path.basename(script_path))[0]}".lower()
+
+    module = sys.modules.get(name)
+    if module is None:
+        sys.path.insert(0, directory)
+        try:
+            spec = importlib.util.spec_from_file_location(name, script_path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            spec.loader.exec_module(module)
+        finally:
+            sys.path.remove(directory)
+
+    base = sys.modules["can_node"].CANNode
+    for value in vars(module).values():
+        if isinstance(value, type) and issubclass(value, base) and value.__module__ == name:
+            return value
+
+    raise ImportError(f"No CANNode subclass found in {script_path}")
@@ -1,65 +1,107 @@
 # Central controller for launching and managing ECUs
 
-import subprocess
-import time
-import signal
-import readchar
+import argparse
+import json
+import os
+import tempfile
+
+# MTD ECUs share one cached mask table instead of each deriving it at import.
+# Set before importing mtd, which loads the table at import, here and in forked ECUs.
+os.environ.setdefault("MTD_MASK_CACHE", os.path.join(tempfile.gettempdir(), f"mtd_masks.{os.getuid()}.bin"))
+
 import can
+import mtd
+import ecu_launcher
+import scenario
+import topology
 
-ecu_processes = []
+launches = []
+launcher = ecu_launcher.spawn     # ecu_launcher.fork to fork ECUs from this process
 running = True
 bus = None 
+mask_shm = None
+
+def publish_masks():
+    """
+    Publish the MTD mask table in shared memory before any ECU imports mtd.
+    """
+    global mask_shm
+    try:
+        mask_shm = mtd.publish_mask_table()
+    except OSError as e:
+        print(f"[Ignition] Shared mask table unavailable, ECUs derive their own — {e}")
+
+def release_masks():
+    """
+    Remove the shared mask table segment.
+    """
+    global mask_shm
+    if mask_shm is not None:
+        mask_shm.close()
+        mask_shm.unlink()
+        mask_shm = None
 
-def launch_all_ecus():
-    """
-    Launch both Static and MTD ECU subprocesses.
-    """
-    # Static ECUs
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/HeadlampSwitch/headlamp_switch_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/Headlamp/headlamp_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/ForceSensor/force_sensor_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/CrashDetector/crash_detector_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/Airbag/airbag_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/IndicatorSwitch/indicator_switch_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/LeftIndicator/left_indicator_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/RightIndicator/right_indicator_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/Battery/battery_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/FuelSystem/fuel_system_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/EngineControl/engine_control_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "Static/ECUs/StarterMotor/starter_motor_ecu.py"]))
-
-    # MTD ECUs
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/HeadlampSwitch/headlamp_switch_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/Headlamp/headlamp_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/ForceSensor/force_sensor_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/CrashDetector/crash_detector_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/Airbag/airbag_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/IndicatorSwitch/indicator_switch_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/LeftIndicator/left_indicator_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/RightIndicator/right_indicator_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/Battery/battery_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/FuelSystem/fuel_system_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/EngineControl/engine_control_ecu.py"]))
-    ecu_processes.append(subprocess.Popen(["python3", "MTD/ECUs/StarterMotor/starter_motor_ecu.py"]))
-    
+def launch(name, args):
+    """
+    Start one ECU (or ECU host) process that reports when it is ready.
+    """
+    launches.append(launcher(name, args, cwd=topology.ROOT))
+
+def wait_for_ecus(timeout=10.0):
+    """
+    Wait until every launched ECU is listening, then report the boot times.
+    """
+    ecu_launcher.wait_ready(launches, timeout)
+    ecu_launcher.report_boot(launches)
+    ecu_launcher.report_memory(launches)
+
+def launch_all_ecus(vehicle):
+    """
+    Launch one process per ECU of the topology.
+    """
+    for ecu in vehicle.ecus:
+        launch(ecu.name, ecu.args())
+
+def launch_ecu_hosts(vehicle):
+    """
+    Launch one ECU host per variant, each running that variant's ECUs in a single process.
+    Hosted ECUs share the host's bus, so per-ECU channels, filters and replicas do not apply.
+    """
+    for variant in vehicle.variants():
+        ecu_dirs = sorted({ecu.ecu_dir for ecu in vehicle.select(variants=[variant]).ecus})
+        launch(f"{variant.upper()} ECU HOST", ("ecu_host.py", variant, "--only", *ecu_dirs,
+                                              "--channel", vehicle.channel, "--interface", vehicle.interface))
+
+def write_pid_file():
+    """
+    Record which process runs which ECU for loggermem. Forked ECUs share ignition's
+    command line, so loggermem cannot find them by script path.
+    """
+    with open(topology.PID_FILE, "w") as f:
+        json.dump({launch.name: launch.proc.pid for launch in launches}, f)
+
+def remove_pid_file():
+    try:
+        os.remove(topology.PID_FILE)
+    except FileNotFoundError:
+        pass
 
 def terminate_ecus():
-    for proc in ecu_processes:
-        try:
-            proc.send_signal(signal.SIGINT)
-            proc.wait(timeout=2)
-        except subprocess.TimeoutExpired:
-            proc.kill()
+    """
+    Stop all ECUs in parallel, killing any that are still running after the shutdown deadline.
+    """
+    ecu_launcher.terminate(launches)
     print("[Ignition] All ECUs terminated.")
 
-def input_loop():
+def input_loop(channel="vcan0", interface="socketcan"):
     """
     Handles user input and sends CAN messages accordingly.
     """
     global running
     global bus
+    import readchar
 
-    bus = can.interface.Bus(channel="vcan0", interface="socketcan")
+    bus = can.interface.Bus(channel=channel, interface=interface)
     print("\nEnter Input — [1] Toggle Headlights, [2] Trigger Crash, [3] Start Engine, [←] Left Indicator, [→] Right Indicator, [↑] Hazard, [q] Quit:")
 
     while running:
@@ -106,6 +148,16 @@ def input_loop():
             running = False
             break
 
+def run_scenario(entries, fast=False, channel="vcan0", interface="socketcan"):
+    """
+    Play a scenario on the control ID instead of reading the keyboard.
+    """
+    global bus
+
+    bus = can.interface.Bus(channel=channel, interface=interface)
+    print(f"[Ignition] Playing {len(entries)} scenario commands" + (" as fast as possible" if fast else ""))
+    scenario.report(scenario.play(bus, entries, fast))
+
 def shutdown_bus():
     """
     Properly shutdown CAN bus.
@@ -116,10 +168,43 @@ def shutdown_bus():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Launch the Static and MTD vehicles")
+    parser.add_argument("--mode", choices=["process", "host"], default="process",
+                        help="one process per ECU, or one ECU host process per variant")
+    parser.add_argument("--launcher", choices=["fork", "spawn"], default="fork",
+                        help="fork ECUs from ignition after importing python-can and AES once, or start fresh interpreters")
+    parser.add_argument("--topology", default=topology.DEFAULT_PATH, help="vehicle description (default: topology.json)")
+    parser.add_argument("--variant", nargs="+", choices=["Static", "MTD"], help="only launch these variants")
+    parser.add_argument("--only", nargs="+", metavar="ECU", help="only launch these ECUs, by name or directory")
+    parser.add_argument("--scenario", metavar="FILE", help="play a scenario file instead of reading keys, then exit")
+    parser.add_argument("--repeat", type=int, default=1, help="play the scenario this many times in a row")
+    parser.add_argument("--period", type=float, help="seconds between repetitions of the scenario")
+    parser.add_argument("--fast", action="store_true", help="ignore the scenario offsets and send as fast as possible")
+    args = parser.parse_args()
+    try:
+        entries = scenario.repeat(scenario.load(args.scenario), args.repeat, args.period) if args.scenario else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    vehicle = topology.load(args.topology).select(args.variant, args.only)
+
     try:
-        launch_all_ecus()
-        time.sleep(1.0)  # Let ECUs boot
-        input_loop()
+        publish_masks()
+        if args.launcher == "fork":
+            # Forking happens before ignition opens its bus or starts any thread
+            ecu_launcher.warm_imports()
+            launcher = ecu_launcher.fork
+        if args.mode == "host":
+            launch_ecu_hosts(vehicle)
+        else:
+            launch_all_ecus(vehicle)
+        write_pid_file()
+        wait_for_ecus()
+        if entries is not None:
+            run_scenario(entries, args.fast, vehicle.channel, vehicle.interface)
+        else:
+            input_loop(vehicle.channel, vehicle.interface)
     finally:
         shutdown_bus()
-        terminate_ecus()
\ No newline at end of file
+        terminate_ecus()
+        remove_pid_file()
+        release_masks()
\ No newline at end of file
@@ -0,0 +1,139 @@
+# Plays scripted ignition commands on the control ID (0x001) without a keyboard
+# A scenario file has one "<offset seconds> <command>" entry per line, the command being a
+# name from COMMANDS or a byte such as 0x02; "#" starts a comment:
+#     0.0   start
+#     3.5   headlights
+#     4.0   0x03
+# Entries are sent at their offsets, or back to back with fast=True. One can.Message is built
+# per command up front and reused for every send, and the achieved rate and timing error
+# are reported at the end.
+
+import statistics
+import time
+import can
+
+CONTROL_ID = 0x001
+
+# Command bytes understood by the ECUs listening on 0x001, as sent by ignition.input_loop
+COMMANDS = {
+    "headlights": 0x02,
+    "crash": 0x03,
+    "left": 0x04,
+    "right": 0x05,
+    "hazard": 0x06,
+    "start": 0x07,
+}
+
+SPIN = 0.0005               # Busy-wait this close to a deadline instead of sleeping past it
+SEND_RETRIES = 3            # Attempts per frame when the socket is out of buffer space
+
+def load(path):
+    """
+    Parse a scenario file into a list of (offset, command byte), ordered by offset.
+    """
+    entries = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                offset, command = line.split()
+                entries.append((float(offset), parse_command(command)))
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: expected '<offset> <command>' — {e}") from None
+    return sorted(entries, key=lambda entry: entry[0])
+
+def parse_command(command):
+    if command in COMMANDS:
+        return COMMANDS[command]
+    value = int(command, 0)
+    if not 0 <= value <= 0xFF:
+        raise ValueError(f"command byte out of range: {command}")
+    return value
+
+def repeat(entries, times, period=None):
+    """
+    The scenario played times times in a row, each repetition period seconds after the last.
+    The default period keeps the rhythm of the last two entries going into the next repetition,
+    or leaves a 1 s gap when there is no rhythm (one entry, or the last two at the same offset).
+    """
+    if times <= 1 or not entries:
+        return list(entries)
+    if period is None:
+        last = entries[-1][0]
+        gap = last - entries[-2][0] if len(entries) > 1 else 0.0
+        period = last + (gap if gap > 0 else 1.0)
+    if period <= 0:
+        raise ValueError(f"repetition period must be positive, got {period}")
+    return [(offset + n * period, command) for n in range(times) for offset, command in entries]
+
+def play(bus, entries, fast=False):
+    """
+    Send the scenario on CONTROL_ID and return the send rate and timing figures.
+    With fast=True offsets are ignored and frames go out as quickly as the bus takes them.
+    The timing error of a frame is measured when its send succeeded, so it includes retries.
+    """
+    messages = {command: can.Message(arbitration_id=CONTROL_ID, data=[command], is_extended_id=False)
+                for command in {command for _, command in entries}}
+    errors = []
+    failed = 0
+    retries = 0
+    start = time.perf_counter()
+
+    for offset, command in entries:
+        msg = messages[command]
+        target = start + offset
+        if not fast:
+            remaining = target - time.perf_counter()
+            if remaining > SPIN:
+                time.sleep(remaining - SPIN)
+            while time.perf_counter() < target:
+                pass
+
+        for attempt in range(SEND_RETRIES):
+            try:
+                bus.send(msg)
+            except can.CanError:
+                if attempt == SEND_RETRIES - 1:
+                    failed += 1
+                else:
+                    retries += 1
+                    time.sleep(0.001 * (attempt + 1))
+            else:
+                if not fast:
+                    errors.append(time.perf_counter() - target)
+                break
+
+    elapsed = time.perf_counter() - start
+    sent = len(entries) - failed
+    result = {
+        "sent": sent,
+        "failed": failed,
+        "retries": retries,
+        "seconds": elapsed,
+        "rate_per_s": sent / elapsed if elapsed > 0 else 0.0,
+    }
+    if errors:
+        us = sorted(error * 1e6 for error in errors)
+        result.update({
+            "error_median_us": statistics.median(us),
+            "error_p99_us": us[min(len(us) - 1, int(len(us) * 0.99))],
+            "error_max_us": us[-1],
+        })
+    return result
+
+def report(result):
+    """
+    Print the outcome of play().
+    """
+    line = (f"[Ignition] Scenario sent {result['sent']} commands in {result['seconds']:.2f} s "
+            f"({result['rate_per_s']:.0f}/s, {result['rate_per_s'] * 60:.0f}/min)")
+    if result["failed"]:
+        line += f", {result['failed']} failed"
+    if result["retries"]:
+        line += f", {result['retries']} retries"
+    print(line)
+    if "error_median_us" in result:
+        print(f"[Ignition] Timing error — median {result['error_median_us']:.0f} us, "
+              f"p99 {result['error_p99_us']:.0f} us, max {result['error_max_us']:.0f} us")
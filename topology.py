@@ -0,0 +1,92 @@
+# Reads topology.json, the one description of the simulated vehicles
+# Lists every ECU with its variant, script, bus channel, broadcast period and the base IDs it
+# listens to. ignition launches from it, loggermem monitors from it and each ECU gets its
+# kernel filter set from it, so subsets or replicated ECUs need no code changes.
+#
+# topology.json:
+#     {"channel": "vcan0", "interface": "socketcan",
+#      "ecus": [{"name": "...", "variant": "Static", "script": "Static/ECUs/.../x_ecu.py",
+#                "listen": ["0x001"], "period": 1.0, "channel": "vcan1", "replicas": 2}, ...]}
+# channel and interface per ECU override the top-level ones; period and replicas are optional.
+
+import json
+import os
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(ROOT, "topology.json")
+PID_FILE = os.path.join(tempfile.gettempdir(), f"ecu_pids.{os.getuid()}.json")     # ECU name -> pid, written by ignition
+
+class ECUSpec:
+    """
+    One ECU process of the topology.
+    """
+    def __init__(self, name, variant, script, channel, interface, listen, period=None):
+        self.name = name
+        self.variant = variant
+        self.script = script                    # Relative to the repository root
+        self.channel = channel
+        self.interface = interface
+        self.listen = frozenset(listen)         # Base IDs, the ECU's kernel filter set
+        self.period = period                    # Seconds between broadcasts, None for the ECU default
+
+    @property
+    def ecu_dir(self):
+        """
+        Directory name of the ECU, e.g. "HeadlampSwitch".
+        """
+        return os.path.basename(os.path.dirname(self.script))
+
+    def args(self):
+        """
+        Command line that runs this ECU, for ecu_launcher.spawn or fork.
+        """
+        args = [self.script, "--name", self.name, "--channel", self.channel, "--interface", self.interface]
+        if self.listen:
+            args += ["--listen"] + [hex(can_id) for can_id in sorted(self.listen)]
+        if self.period is not None:
+            args += ["--period", str(self.period)]
+        return tuple(args)
+
+class Topology:
+    def __init__(self, channel, interface, ecus):
+        self.channel = channel                  # Channel ignition sends control frames on
+        self.interface = interface
+        self.ecus = ecus
+
+    def select(self, variants=None, only=None):
+        """
+        A topology with the ECUs of the given variants, optionally only the given names or ECU directories.
+        """
+        ecus = [
+            ecu for ecu in self.ecus
+            if (not variants or ecu.variant in variants) and (not only or ecu.name in only or ecu.ecu_dir in only)
+        ]
+        return Topology(self.channel, self.interface, ecus)
+
+    def variants(self):
+        return sorted({ecu.variant for ecu in self.ecus})
+
+def load(path=DEFAULT_PATH):
+    """
+    Parse a topology file. An ECU with "replicas": n becomes n ECUs named "NAME #1" ... "NAME #n".
+    """
+    with open(path) as f:
+        config = json.load(f)
+
+    channel = config.get("channel", "vcan0")
+    interface = config.get("interface", "socketcan")
+    ecus = []
+    for entry in config["ecus"]:
+        replicas = entry.get("replicas", 1)
+        for replica in range(1, replicas + 1):
+            ecus.append(ECUSpec(
+                name=entry["name"] if replicas == 1 else f"{entry['name']} #{replica}",
+                variant=entry["variant"],
+                script=entry["script"],
+                channel=entry.get("channel", channel),
+                interface=entry.get("interface", interface),
+                listen=[int(can_id, 0) for can_id in entry.get("listen", [])],
+                period=entry.get("period"),
+            ))
+    return Topology(channel, interface, ecus)